@@ -0,0 +1,250 @@
+"""
+Benchmarks each of the intcode package's backends against the puzzle programs that use Intcode.
+
+    python benchmark.py                  # run everything and print a table
+    python benchmark.py --save           # ...and store the results as the baseline
+    python benchmark.py --compare        # ...and flag anything slower than the baseline
+
+Each backend runs each workload `--repeat` times. We report the mean wall time, its standard
+deviation across runs, instructions executed per second, and peak memory allocated during one
+extra run under tracemalloc. Instruction counts come from a profiled IntcodeComputer run of the
+same workload, so they're the same for every backend.
+"""
+from typing import Callable, Dict, Generator, List, NamedTuple, Optional
+import argparse
+import itertools as it
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from intcode import BACKENDS, IntcodeComputer, run_intcode
+from intcode.loader import load_program
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(ROOT, "benchmark_baseline.json")
+
+# run(program, inputs) -> outputs, or the memory image when it halts
+Run = Callable[[List[int], List[int]], List[int]]
+
+
+class Engine(NamedTuple):
+    outputs: Run
+    memory: Run
+
+
+def read_program(day: str) -> List[int]:
+    return load_program(os.path.join(ROOT, day, "input.txt"))
+
+
+### Engines ###
+
+def backend_engine(backend: str) -> Engine:
+    def outputs(program: List[int], inputs: List[int]) -> List[int]:
+        return run_intcode(program, inputs, backend)
+
+    def memory(program: List[int], inputs: List[int]) -> List[int]:
+        computer = IntcodeComputer(program, **BACKENDS[backend])
+        computer.feed(inputs)
+        computer.run()
+        return [computer.memory[addr] for addr in range(len(program))]
+
+    return Engine(outputs, memory)
+
+
+def load_engines() -> Dict[str, Engine]:
+    return {f"intcode ({backend})": backend_engine(backend) for backend in BACKENDS}
+
+
+### Workloads ###
+
+class Workload(NamedTuple):
+    # runs the workload with an engine, returning its answer so engines can be checked
+    run: Callable[[Engine], int]
+    # generator of every (program, inputs) the workload runs, sent the last output of each, for
+    # counting instructions
+    runs: Callable[[], Generator]
+
+
+def single_run(day: str, inputs: List[int], patch: Optional[Dict[int, int]] = None,
+               answer_address: Optional[int] = None) -> Workload:
+    """
+    One run of a day's program. The answer is its last output, or for programs that don't output
+    anything, what's at `answer_address` when it halts.
+    """
+    program = read_program(day)
+    for addr, value in (patch or {}).items():
+        program[addr] = value
+
+    def run(engine: Engine) -> int:
+        if answer_address is not None:
+            return engine.memory(program, inputs)[answer_address]
+        outputs = engine.outputs(program, inputs)
+        return outputs[-1] if outputs else 0
+
+    def runs():
+        yield program, inputs
+
+    return Workload(run, runs)
+
+
+def amplifier_workload() -> Workload:
+    """Day 7 part 1: every phase setting, each through a chain of five amplifiers."""
+    program = read_program("day-07")
+
+    def amp_runs():
+        for phase_setting in it.permutations(range(5)):
+            signal = 0
+            for phase in phase_setting:
+                signal = yield program, [phase, signal]
+
+    def run(engine: Engine) -> int:
+        best = 0
+        for phase_setting in it.permutations(range(5)):
+            signal = 0
+            for phase in phase_setting:
+                signal = engine.outputs(program, [phase, signal])[-1]
+            best = max(best, signal)
+        return best
+
+    return Workload(run, amp_runs)
+
+
+def load_workloads() -> Dict[str, Workload]:
+    return {
+        "day-02": single_run("day-02", [], patch={1: 12, 2: 2}, answer_address=0),
+        "day-05 part 1": single_run("day-05", [1]),
+        "day-05 part 2": single_run("day-05", [5]),
+        "day-07": amplifier_workload(),
+        "day-09 part 1": single_run("day-09", [1]),
+        "day-09 part 2": single_run("day-09", [2]),
+        # the robot on an all-black hull: the camera always sees 0
+        "day-11": single_run("day-11", [0] * 20000),
+    }
+
+
+def count_instructions(workload: Workload) -> int:
+    instructions = 0
+    runs = workload.runs()
+    last_output = None
+    while True:
+        try:
+            program, inputs = runs.send(last_output)
+        except StopIteration:
+            break
+        computer = IntcodeComputer(program)
+        profile = computer.enable_profiling()
+        computer.feed(inputs)
+        computer.run()
+        instructions += profile.report()["instructions"]
+        last_output = computer.outputs[-1] if computer.outputs else 0
+    return instructions
+
+
+### Measuring ###
+
+def measure(engine: Engine, workload: Workload, repeat: int) -> Dict:
+    # an untimed run first, so one-off costs like compiling blocks don't count
+    answer = workload.run(engine)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload.run(engine)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    workload.run(engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "answer": answer,
+        "mean_seconds": statistics.mean(times),
+        "stdev_seconds": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(engine_names: Optional[List[str]], workload_names: Optional[List[str]],
+                   repeat: int) -> Dict[str, Dict[str, Dict]]:
+    engines = load_engines()
+    workloads = load_workloads()
+    results: Dict[str, Dict[str, Dict]] = {}
+    for workload_name, workload in workloads.items():
+        if workload_names and workload_name not in workload_names:
+            continue
+        instructions = count_instructions(workload)
+        expected = None
+        for engine_name, engine in engines.items():
+            if engine_names and engine_name not in engine_names:
+                continue
+            result = measure(engine, workload, repeat)
+            if expected is None:
+                expected = result["answer"]
+            elif result["answer"] != expected:
+                raise AssertionError(f"{engine_name} got {result['answer']} for {workload_name},"
+                                     f" expected {expected}")
+            result["instructions"] = instructions
+            result["instructions_per_second"] = instructions / result["mean_seconds"]
+            results.setdefault(workload_name, {})[engine_name] = result
+            print(f"{workload_name:<14} {engine_name:<30} {result['mean_seconds'] * 1000:9.2f}ms"
+                  f" ±{result['stdev_seconds'] * 1000:7.2f}ms"
+                  f" {result['instructions_per_second'] / 1e6:7.2f}M instr/s"
+                  f" {result['peak_bytes'] / 1024:9.1f}KiB", flush=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Dict]], baseline: Dict[str, Dict[str, Dict]],
+            tolerance: float) -> List[str]:
+    """
+    Results that are slower than the baseline by more than `tolerance` (a fraction), and by more
+    than the noise in either measurement.
+    """
+    regressions = []
+    for workload_name, engines in results.items():
+        for engine_name, result in engines.items():
+            old = baseline.get(workload_name, {}).get(engine_name)
+            if old is None:
+                continue
+            slowdown = result["mean_seconds"] - old["mean_seconds"]
+            noise = 2 * max(result["stdev_seconds"], old["stdev_seconds"])
+            if slowdown > tolerance * old["mean_seconds"] and slowdown > noise:
+                regressions.append(f"{workload_name} / {engine_name}: "
+                                   f"{old['mean_seconds'] * 1000:.2f}ms -> "
+                                   f"{result['mean_seconds'] * 1000:.2f}ms "
+                                   f"({result['mean_seconds'] / old['mean_seconds'] - 1:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--engine", action="append", help="only run this engine")
+    parser.add_argument("--workload", action="append", help="only run this workload")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="fraction slower than the baseline that counts as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.engine, args.workload, args.repeat)
+    status = 0
+    if args.compare:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        if regressions:
+            status = 1
+        else:
+            print("No regressions against", args.baseline)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat,
+                       "results": results}, f, indent=2)
+        print("Saved baseline to", args.baseline)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
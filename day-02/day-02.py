@@ -1,21 +1,44 @@
-from typing import List
-from operator import add, mul
+from typing import List, Optional, Sequence, Tuple
+import itertools as it
+import sys
+import time
+sys.path.append("..")
+from intcode import BACKENDS, DEFAULT_BACKEND, IntcodeComputer
+from intcode.batch import BatchIntcode
+from intcode.loader import load_program
+from noun_verb_search import serial_search, parallel_search
+from symbolic_intcode import solve_noun_verb
+
+# `python day-02.py --benchmark` also times each way of searching for part 2
+BENCHMARK = "--benchmark" in sys.argv
 
 def parse(program_str: str) -> List[int]:
     return [int(i) for i in program_str.split(",")]
 
 def run_intcode(program: List[int], noun: int = None, verb: int = None) -> List[int]:
-    program = program[:]
-    if noun:
-        program[1] = noun
-    if verb:
-        program[2] = verb
-    pointer = 0
-    while program[pointer] != 99:
-        op = add if program[pointer] == 1 else mul
-        program[program[pointer+3]] = op(program[program[pointer+1]], program[program[pointer+2]])
-        pointer += 4
-    return program
+    computer = IntcodeComputer(program, **BACKENDS[DEFAULT_BACKEND])
+    if noun is not None:
+        computer.memory[1] = noun
+    if verb is not None:
+        computer.memory[2] = verb
+    computer.run()
+    # the memory grows past the end of the program as it's used
+    return [computer.memory[addr] for addr in range(len(program))]
+
+def batch_search(program: List[int], target: int, nouns: Sequence[int] = range(100),
+                 verbs: Sequence[int] = range(100)) -> Optional[Tuple[int, int]]:
+    # try every (noun, verb) at once, one per lane
+    lane_nouns, lane_verbs = zip(*it.product(nouns, verbs))
+    batch = BatchIntcode(program, len(lane_nouns))
+    batch.poke(1, lane_nouns)
+    batch.poke(2, lane_verbs)
+    batch.run()
+    outputs = batch.read(0)
+    if target not in outputs:
+        return None
+    lane = outputs.index(target)
+    return lane_nouns[lane], lane_verbs[lane]
+
 
 assert run_intcode(parse("1,0,0,0,99")) == [2,0,0,0,99]
 assert run_intcode(parse("2,3,0,3,99")) == [2,3,0,6,99]
@@ -23,11 +46,16 @@ assert run_intcode(parse("2,4,4,5,99,0")) == [2,4,4,5,99,9801]
 assert run_intcode(parse("1,1,1,4,99,5,6,0,99")) == [30,1,1,4,2,5,6,0,99]
 assert run_intcode(parse("1,9,10,3,2,3,11,0,99,30,40,50")) == [3500,9,10,70,2,3,11,0,99,30,40,50]
 
-with open("input.txt") as f:
-    program = parse(f.read().strip())
+# the search pool's workers may import this module, so they mustn't run the puzzle themselves
+if __name__ == "__main__":
+    program = load_program("input.txt")
     print("Part 1:", run_intcode(list(program), 12, 2)[0])
-    for noun in range(100):
-        for verb in range(100):
-            if run_intcode(program, noun, verb)[0] == 19690720:
-                print("Part 2:", noun * 100 + verb)
-                break
+    noun, verb = solve_noun_verb(program, 19690720)
+    print("Part 2:", noun * 100 + verb)
+
+    if BENCHMARK:
+        for name, search in [("Serial", serial_search), ("Parallel", parallel_search),
+                             ("Batch", batch_search), ("Symbolic", solve_noun_verb)]:
+            start = time.perf_counter()
+            assert search(program, 19690720) == (noun, verb)
+            print(f"{name} search: {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,74 @@
+from typing import List, Optional, Sequence, Tuple
+import multiprocessing as mp
+from multiprocessing.synchronize import Event
+import sys
+sys.path.append("..")
+from intcode import BACKENDS, DEFAULT_BACKEND, IntcodeComputer
+
+NounVerb = Tuple[int, int]
+
+# Set in each worker when the pool starts, so the program is sent to each worker once rather than
+# with every shard.
+_program: List[int] = []
+_found: Optional[Event] = None
+
+
+def output(program: List[int], noun: int, verb: int) -> int:
+    computer = IntcodeComputer(program, **BACKENDS[DEFAULT_BACKEND])
+    computer.memory[1] = noun
+    computer.memory[2] = verb
+    computer.run()
+    return computer.memory[0]
+
+
+def serial_search(program: List[int], target: int, nouns: Sequence[int] = range(100),
+                  verbs: Sequence[int] = range(100)) -> Optional[NounVerb]:
+    for noun in nouns:
+        for verb in verbs:
+            if output(program, noun, verb) == target:
+                return noun, verb
+    return None
+
+
+def _init_worker(program: List[int], found: Event) -> None:
+    global _program, _found
+    _program = program
+    _found = found
+
+
+def _search_shard(shard: Tuple[Sequence[int], Sequence[int], int]) -> Optional[NounVerb]:
+    nouns, verbs, target = shard
+    for noun in nouns:
+        # another worker found it, so give up on the rest of this shard
+        if _found.is_set():
+            return None
+        for verb in verbs:
+            if output(_program, noun, verb) == target:
+                _found.set()
+                return noun, verb
+    return None
+
+
+def parallel_search(program: List[int], target: int, nouns: Sequence[int] = range(100),
+                    verbs: Sequence[int] = range(100),
+                    processes: Optional[int] = None) -> Optional[NounVerb]:
+    """
+    Search for the (noun, verb) giving `target`, with the nouns split between a pool of processes.
+    As soon as any worker finds a match, the others stop and the pool is shut down.
+    """
+    processes = processes or mp.cpu_count()
+    shard_size = max(1, len(nouns) // (processes * 4))
+    shards = [(nouns[idx:idx+shard_size], verbs, target)
+              for idx in range(0, len(nouns), shard_size)]
+    found = mp.Event()
+    with mp.Pool(processes, initializer=_init_worker, initargs=(program, found)) as pool:
+        for result in pool.imap_unordered(_search_shard, shards):
+            if result is not None:
+                return result
+    return None
+
+
+### Tests ###
+
+assert output([1,0,0,3, 2,3,11,0, 99,30,40,50], 9, 10) == 3500
+assert serial_search([1,0,0,3, 2,3,11,0, 99,30,40,50], 3500, range(20), range(20)) == (9, 10)
@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from noun_verb_search import NounVerb, parallel_search
+
+# (noun power, verb power)
+Monomial = Tuple[int, int]
+
+
+class Polynomial:
+    """A polynomial in the noun and verb, with int coefficients."""
+    def __init__(self, terms: Dict[Monomial, int]):
+        self.terms = {monomial: coeff for monomial, coeff in terms.items() if coeff}
+
+    @classmethod
+    def constant(cls, value: int) -> "Polynomial":
+        return cls({(0, 0): value})
+
+    def __add__(self, other: "Polynomial") -> "Polynomial":
+        terms = dict(self.terms)
+        for monomial, coeff in other.terms.items():
+            terms[monomial] = terms.get(monomial, 0) + coeff
+        return Polynomial(terms)
+
+    def __mul__(self, other: "Polynomial") -> "Polynomial":
+        terms: Dict[Monomial, int] = {}
+        for (noun_pow1, verb_pow1), coeff1 in self.terms.items():
+            for (noun_pow2, verb_pow2), coeff2 in other.terms.items():
+                monomial = (noun_pow1 + noun_pow2, verb_pow1 + verb_pow2)
+                terms[monomial] = terms.get(monomial, 0) + coeff1 * coeff2
+        return Polynomial(terms)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Polynomial) and self.terms == other.terms
+
+    def __repr__(self) -> str:
+        return f"Polynomial({self.terms})"
+
+    def constant_value(self) -> Optional[int]:
+        """The polynomial's value if it doesn't depend on the noun or verb, otherwise None."""
+        if any(monomial != (0, 0) for monomial in self.terms):
+            return None
+        return self.terms.get((0, 0), 0)
+
+    def in_verb(self, noun: int) -> List[int]:
+        """Coefficients of the polynomial in the verb once the noun is fixed, lowest power first."""
+        coeffs = [0] * (max((verb_pow for _, verb_pow in self.terms), default=0) + 1)
+        for (noun_pow, verb_pow), coeff in self.terms.items():
+            coeffs[verb_pow] += coeff * noun ** noun_pow
+        while len(coeffs) > 1 and coeffs[-1] == 0:
+            coeffs.pop()
+        return coeffs
+
+
+NOUN = Polynomial({(1, 0): 1})
+VERB = Polynomial({(0, 1): 1})
+
+
+def symbolic_run(program: List[int]) -> Optional[Polynomial]:
+    """
+    Run the add/multiply subset of Intcode with the noun and verb left as symbols, returning
+    address 0 as a polynomial in them.
+
+    Values read from an address that depends on the noun or verb are unknown (None). That's fine
+    as long as they're overwritten or never used, but if an unknown or symbolic value is needed
+    as an opcode or an address to write to, or anything other than add, multiply or halt is run,
+    we give up and return None.
+    """
+    memory: List[Optional[Polynomial]] = [Polynomial.constant(value) for value in program]
+    memory[1] = NOUN
+    memory[2] = VERB
+
+    def concrete(addr: int) -> Optional[int]:
+        value = memory[addr] if 0 <= addr < len(memory) else None
+        return None if value is None else value.constant_value()
+
+    ptr = 0
+    while True:
+        opcode = concrete(ptr)
+        if opcode == 99:
+            return memory[0]
+        if opcode not in (1, 2):
+            return None
+        dest = concrete(ptr + 3)
+        if dest is None or not 0 <= dest < len(memory):
+            return None
+        args = []
+        for arg_addr in (concrete(ptr + 1), concrete(ptr + 2)):
+            in_memory = arg_addr is not None and 0 <= arg_addr < len(memory)
+            args.append(memory[arg_addr] if in_memory else None)
+        if None in args:
+            memory[dest] = None
+        elif opcode == 1:
+            memory[dest] = args[0] + args[1]
+        else:
+            memory[dest] = args[0] * args[1]
+        ptr += 4
+
+
+def solve(polynomial: Polynomial, target: int, nouns: Sequence[int] = range(100),
+          verbs: Sequence[int] = range(100)) -> Optional[NounVerb]:
+    """The first (noun, verb) where the polynomial equals `target`."""
+    for noun in nouns:
+        coeffs = polynomial.in_verb(noun)
+        coeffs[0] -= target
+        if len(coeffs) == 1:
+            if coeffs[0] == 0 and len(verbs):
+                return noun, verbs[0]
+        elif len(coeffs) == 2:
+            constant, slope = coeffs
+            if -constant % slope == 0 and -constant // slope in verbs:
+                return noun, -constant // slope
+        else:
+            for verb in verbs:
+                if sum(coeff * verb ** power for power, coeff in enumerate(coeffs)) == 0:
+                    return noun, verb
+    return None
+
+
+def solve_noun_verb(program: List[int], target: int, nouns: Sequence[int] = range(100),
+                    verbs: Sequence[int] = range(100)) -> Optional[NounVerb]:
+    polynomial = symbolic_run(program)
+    if polynomial is None:
+        return parallel_search(program, target, nouns, verbs)
+    return solve(polynomial, target, nouns, verbs)
+
+
+### Tests ###
+
+# the first instruction's result depends on what's at the noun and verb addresses, but it's
+# overwritten with noun + verb before being used
+sum_program = [1,0,0,3, 1,1,2,3, 2,3,13,0, 99,7]
+assert symbolic_run(sum_program) == NOUN * Polynomial.constant(7) + VERB * Polynomial.constant(7)
+assert solve_noun_verb(sum_program, 7 * (12 + 34)) == (0, 46)
+assert solve(NOUN * NOUN + VERB * VERB * VERB, 5 ** 2 + 3 ** 3) == (5, 3)
+assert solve(NOUN * VERB + NOUN, 6) == (1, 5)
+# here the unknown value ends up at address 0
+assert symbolic_run([1,9,10,3,2,3,11,0,99,30,40,50]) is None
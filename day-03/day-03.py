@@ -1,4 +1,7 @@
 from typing import List, Tuple
+import random
+from segments import crossings
+from wire_index import WireIndex, pairwise_by_crossings, random_routes
 
 
 def get_points(route: List[str]) -> List[Tuple[int, int]]:
@@ -26,19 +29,11 @@ def manhattan_distance(start: Tuple[int, int], end: Tuple[int, int]) -> int:
 
 
 def distance_to_closest_intersection(route1: List[str], route2: List[str]) -> int:
-    intersections = set(get_points(route1)) & set(get_points(route2))
-    return min(manhattan_distance((0, 0), intersection) for intersection in intersections)
+    return min(manhattan_distance((0, 0), point) for point, _ in crossings(route1, route2))
 
 
 def fewest_steps(route1: List[str], route2: List[str]) -> int:
-    route1_points = get_points(route1)
-    route2_points = get_points(route2)
-    intersections = set(route1_points) & set(route2_points)
-
-    def steps_needed(intersection: Tuple[int, int]) -> int:
-        return route1_points.index(intersection) + route2_points.index(intersection) + 2
-
-    return min(steps_needed(intersection) for intersection in intersections)
+    return min(steps for _, steps in crossings(route1, route2))
 
 
 examples = [("R8,U5,L5,D3", "U7,R6,D4,L4", 6, 30),
@@ -52,8 +47,30 @@ for route1_str, route2_str, distance, steps in examples:
     assert distance_to_closest_intersection(route1, route2) == distance
     assert fewest_steps(route1, route2) == steps
 
-with open("input.txt") as f:
-    routes = f.read().split("\n")
-    route1, route2 = routes[0].split(","), routes[1].split(",")
+# The same answers as walking every point, on wires that keep running over themselves and each
+# other. (The first point a wire reaches is at index 0, so the steps to a point are index + 1.)
+rng = random.Random(3)
+for _ in range(200):
+    route1, route2 = [[rng.choice("RLUD") + str(rng.randint(0, 6)) for _ in range(12)]
+                      for _ in range(2)]
+    points1, points2 = get_points(route1), get_points(route2)
+    intersections = (set(points1) & set(points2)) - {(0, 0)}
+    if not intersections:
+        assert not list(crossings(route1, route2))
+        continue
+    assert distance_to_closest_intersection(route1, route2) == \
+        min(manhattan_distance((0, 0), point) for point in intersections)
+    assert fewest_steps(route1, route2) == \
+        min(points1.index(point) + points2.index(point) + 2 for point in intersections)
+
+# the wire index's pool workers may import this module, so they mustn't run the puzzle themselves
+if __name__ == "__main__":
+    with open("input.txt") as f:
+        routes = [line.split(",") for line in f.read().split("\n") if line]
+    route1, route2 = routes[0], routes[1]
     print("Part 1:", distance_to_closest_intersection(route1, route2))
     print("Part 2:", fewest_steps(route1, route2))
+
+    # every pair of a board of wires at once, with the strips shared out between processes
+    board = random_routes(random.Random(2019), 30, 40, 50) + routes
+    assert WireIndex(board, num_strips=8).pairwise(processes=2) == pairwise_by_crossings(board)
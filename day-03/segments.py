@@ -0,0 +1,131 @@
+"""
+Finding where two wires cross from their moves, without listing every point along them.
+
+Each move is kept as a straight segment, with the number of steps the wire took to reach its
+start. Horizontal segments of one wire and vertical segments of the other are crossed with a sweep
+from left to right. Segments of the two wires that lie along the same line can overlap for many
+points; for those we only give the points that could be the nearest or the fewest steps, which
+are the ends of the overlap and the points on it nearest the origin.
+"""
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+import bisect
+from collections import defaultdict
+
+Point = Tuple[int, int]
+
+
+class Segment(NamedTuple):
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    # the steps taken to reach (x1, y1)
+    steps: int
+
+    def steps_to(self, point: Point) -> int:
+        return self.steps + abs(point[0] - self.x1) + abs(point[1] - self.y1)
+
+
+DIRECTIONS = {"R": (1, 0), "L": (-1, 0), "U": (0, 1), "D": (0, -1)}
+
+
+def get_segments(route: List[str]) -> List[Segment]:
+    segments = []
+    x, y, steps = 0, 0, 0
+    for move in route:
+        if move[0] not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {move[0]}")
+        dx, dy = DIRECTIONS[move[0]]
+        length = int(move[1:])
+        if length:
+            segments.append(Segment(x, y, x + dx * length, y + dy * length, steps))
+        x, y, steps = x + dx * length, y + dy * length, steps + length
+    return segments
+
+
+def _perpendicular(horizontals: List[Segment],
+                   verticals: List[Segment]) -> Iterator[Tuple[Point, int]]:
+    """Where the horizontal segments cross the vertical ones, sweeping from left to right."""
+    # (left or right end, index into `horizontals`)
+    starts = sorted((min(seg.x1, seg.x2), idx) for idx, seg in enumerate(horizontals))
+    ends = sorted((max(seg.x1, seg.x2), idx) for idx, seg in enumerate(horizontals))
+    # the horizontal segments the sweep is over, as (y, index into `horizontals`)
+    active: List[Tuple[int, int]] = []
+    next_start = next_end = 0
+    for vertical in sorted(verticals, key=lambda seg: seg.x1):
+        x = vertical.x1
+        while next_start < len(starts) and starts[next_start][0] <= x:
+            idx = starts[next_start][1]
+            bisect.insort(active, (horizontals[idx].y1, idx))
+            next_start += 1
+        while next_end < len(ends) and ends[next_end][0] < x:
+            idx = ends[next_end][1]
+            del active[bisect.bisect_left(active, (horizontals[idx].y1, idx))]
+            next_end += 1
+        low, high = sorted((vertical.y1, vertical.y2))
+        for y, idx in active[bisect.bisect_left(active, (low, -1)):
+                             bisect.bisect_right(active, (high, len(horizontals)))]:
+            point = (x, y)
+            yield point, horizontals[idx].steps_to(point) + vertical.steps_to(point)
+
+
+def overlap_candidates(low: int, high: int) -> List[int]:
+    """
+    Positions along an overlap of two collinear segments worth checking: the ends, where the total
+    steps are fewest, the positions nearest 0, and their neighbours in case the origin is one.
+    """
+    candidates = {low, low + 1, high - 1, high, min(max(0, low), high), -1, 1}
+    return [position for position in candidates if low <= position <= high]
+
+
+def _collinear(segments1: List[Segment], segments2: List[Segment],
+               horizontal: bool) -> Iterator[Tuple[Point, int]]:
+    """Candidate points where segments of the two wires lie over each other along a line."""
+    lines: Dict[int, List[Tuple[int, int, int, Segment]]] = defaultdict(list)
+    for wire, segments in enumerate([segments1, segments2]):
+        for seg in segments:
+            line, a, b = (seg.y1, seg.x1, seg.x2) if horizontal else (seg.x1, seg.y1, seg.y2)
+            lines[line].append((min(a, b), max(a, b), wire, seg))
+    for line, intervals in lines.items():
+        intervals.sort(key=lambda interval: interval[:2])
+        active: List[List[Tuple[int, Segment]]] = [[], []]
+        for low, high, wire, seg in intervals:
+            # the other wire's segments that have ended can't overlap this or any later one
+            other = active[1 - wire] = [(end, other_seg) for end, other_seg in active[1 - wire]
+                                        if end >= low]
+            for end, other_seg in other:
+                for position in overlap_candidates(low, min(high, end)):
+                    point = (position, line) if horizontal else (line, position)
+                    yield point, seg.steps_to(point) + other_seg.steps_to(point)
+            active[wire].append((high, seg))
+
+
+def crossings(route1: List[str], route2: List[str]) -> Iterator[Tuple[Point, int]]:
+    """
+    Points where the wires cross (other than the origin), with the total steps both wires take to
+    get there. A point can come up more than once, with different steps if a wire goes through it
+    more than once. Where the wires run along each other, only the candidate points are given.
+    """
+    segments1, segments2 = get_segments(route1), get_segments(route2)
+    horizontals1 = [seg for seg in segments1 if seg.y1 == seg.y2]
+    horizontals2 = [seg for seg in segments2 if seg.y1 == seg.y2]
+    verticals1 = [seg for seg in segments1 if seg.x1 == seg.x2]
+    verticals2 = [seg for seg in segments2 if seg.x1 == seg.x2]
+    for point, steps in [*_perpendicular(horizontals1, verticals2),
+                         *_perpendicular(horizontals2, verticals1),
+                         *_collinear(horizontals1, horizontals2, horizontal=True),
+                         *_collinear(verticals1, verticals2, horizontal=False)]:
+        if point != (0, 0):
+            yield point, steps
+
+
+### Tests ###
+
+assert get_segments(["R8", "U5", "L0", "D3"]) == [Segment(0, 0, 8, 0, 0), Segment(8, 0, 8, 5, 8),
+                                                  Segment(8, 5, 8, 2, 13)]
+assert sorted(crossings(["R8", "U5", "L5", "D3"], ["U7", "R6", "D4", "L4"])) == \
+    [((3, 3), 40), ((6, 5), 30)]
+# along the same line for a while, through the origin, and a million steps without a million points
+assert min(steps for _, steps in crossings(["L3", "R6"], ["R2", "U1"])) == 8
+assert min(abs(x) + abs(y) for (x, y), _ in crossings(["L3", "R6"], ["L1", "R4"])) == 1
+assert min(crossings(["R1000000", "U5"], ["U5", "R2000000"])) == ((1000000, 5), 2000010)
@@ -0,0 +1,196 @@
+"""
+The closest and fewest-steps crossing for every pair of many wires on one board.
+
+Every wire's segments go into one index of vertical strips of the board. A vertical segment goes
+in the strip its x is in, and a horizontal segment in each strip it passes through, clipped to
+that strip. A crossing is always inside one strip, so each strip is swept on its own (across all
+the wires at once), and the strips can be shared out between a pool of processes. The best
+crossings from each strip are then combined per pair of wires.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+import bisect
+import multiprocessing as mp
+import random
+from collections import defaultdict
+from segments import Point, Segment, overlap_candidates, crossings, get_segments
+
+WirePair = Tuple[int, int]
+# the Manhattan distance to the closest crossing, and the fewest total steps to a crossing
+Best = Tuple[int, int]
+
+
+class Span(NamedTuple):
+    """Part of a segment, from `low` to `high` along it."""
+    low: int
+    high: int
+    wire: int
+    segment: Segment
+
+
+class Strip(NamedTuple):
+    horizontals: List[Span]
+    verticals: List[Span]
+
+
+def _record(best: Dict[WirePair, List[int]], wire1: int, wire2: int, point: Point,
+            steps: int) -> None:
+    if point == (0, 0):
+        return
+    pair = (wire1, wire2) if wire1 < wire2 else (wire2, wire1)
+    distance = abs(point[0]) + abs(point[1])
+    if pair in best:
+        pair_best = best[pair]
+        pair_best[0] = min(pair_best[0], distance)
+        pair_best[1] = min(pair_best[1], steps)
+    else:
+        best[pair] = [distance, steps]
+
+
+def _sweep(strip: Strip, best: Dict[WirePair, List[int]]) -> None:
+    """Crossings of horizontal and vertical segments of different wires, from left to right."""
+    horizontals = strip.horizontals
+    starts = sorted((span.low, idx) for idx, span in enumerate(horizontals))
+    ends = sorted((span.high, idx) for idx, span in enumerate(horizontals))
+    # the horizontal spans the sweep is over, as (y, index into `horizontals`)
+    active: List[Tuple[int, int]] = []
+    next_start = next_end = 0
+    for vertical in sorted(strip.verticals, key=lambda span: span.segment.x1):
+        x = vertical.segment.x1
+        while next_start < len(starts) and starts[next_start][0] <= x:
+            idx = starts[next_start][1]
+            bisect.insort(active, (horizontals[idx].segment.y1, idx))
+            next_start += 1
+        while next_end < len(ends) and ends[next_end][0] < x:
+            idx = ends[next_end][1]
+            del active[bisect.bisect_left(active, (horizontals[idx].segment.y1, idx))]
+            next_end += 1
+        for y, idx in active[bisect.bisect_left(active, (vertical.low, -1)):
+                             bisect.bisect_right(active, (vertical.high, len(horizontals)))]:
+            horizontal = horizontals[idx]
+            if horizontal.wire != vertical.wire:
+                point = (x, y)
+                _record(best, horizontal.wire, vertical.wire, point,
+                        horizontal.segment.steps_to(point) + vertical.segment.steps_to(point))
+
+
+def _overlaps(spans: List[Span], horizontal: bool, best: Dict[WirePair, List[int]]) -> None:
+    """Where spans of different wires lie over each other along the same line."""
+    lines: Dict[int, List[Span]] = defaultdict(list)
+    for span in spans:
+        lines[span.segment.y1 if horizontal else span.segment.x1].append(span)
+    for line, line_spans in lines.items():
+        line_spans.sort()
+        active: List[Span] = []
+        for span in line_spans:
+            # spans that have ended can't overlap this or any later one
+            active = [other for other in active if other.high >= span.low]
+            for other in active:
+                if other.wire == span.wire:
+                    continue
+                for position in overlap_candidates(span.low, min(span.high, other.high)):
+                    point = (position, line) if horizontal else (line, position)
+                    _record(best, span.wire, other.wire, point,
+                            span.segment.steps_to(point) + other.segment.steps_to(point))
+            active.append(span)
+
+
+def best_in_strip(strip: Strip) -> Dict[WirePair, List[int]]:
+    best: Dict[WirePair, List[int]] = {}
+    _sweep(strip, best)
+    _overlaps(strip.horizontals, True, best)
+    _overlaps(strip.verticals, False, best)
+    return best
+
+
+# Set in each worker when the pool starts, so the strips are sent to each worker once
+_strips: List[Strip] = []
+
+
+def _init_worker(strips: List[Strip]) -> None:
+    global _strips
+    _strips = strips
+
+
+def _best_in_strip_number(strip_number: int) -> Dict[WirePair, List[int]]:
+    return best_in_strip(_strips[strip_number])
+
+
+class WireIndex:
+    """
+    All the wires' segments, split into `num_strips` strips of the board. Build it once, then
+    `pairwise` gives every pair of wires' best crossings.
+    """
+    def __init__(self, routes: List[List[str]], num_strips: int = 1):
+        wires = [get_segments(route) for route in routes]
+        xs = [x for segments in wires for seg in segments for x in (seg.x1, seg.x2)] or [0]
+        self.left = min(xs)
+        self.strip_width = (max(xs) - self.left) // num_strips + 1
+        self.strips = [Strip([], []) for _ in range(num_strips)]
+        for wire, segments in enumerate(wires):
+            for seg in segments:
+                if seg.x1 == seg.x2:
+                    low, high = sorted((seg.y1, seg.y2))
+                    self.strips[self._strip_number(seg.x1)].verticals.append(
+                        Span(low, high, wire, seg))
+                    continue
+                low, high = sorted((seg.x1, seg.x2))
+                for strip_number in range(self._strip_number(low), self._strip_number(high) + 1):
+                    strip_left = self.left + strip_number * self.strip_width
+                    self.strips[strip_number].horizontals.append(
+                        Span(max(low, strip_left), min(high, strip_left + self.strip_width - 1),
+                             wire, seg))
+
+    def _strip_number(self, x: int) -> int:
+        return (x - self.left) // self.strip_width
+
+    def pairwise(self, processes: int = 1) -> Dict[WirePair, Best]:
+        """
+        The closest distance and fewest steps to a crossing for each pair of wires (by their
+        numbers, lowest first) that cross anywhere but the origin. With more than one process, the
+        strips are shared out between a pool.
+        """
+        if processes > 1:
+            with mp.Pool(processes, initializer=_init_worker, initargs=(self.strips,)) as pool:
+                strip_bests = pool.map(_best_in_strip_number, range(len(self.strips)))
+        else:
+            strip_bests = [best_in_strip(strip) for strip in self.strips]
+        combined: Dict[WirePair, List[int]] = {}
+        for strip_best in strip_bests:
+            for pair, (distance, steps) in strip_best.items():
+                if pair in combined:
+                    combined[pair][0] = min(combined[pair][0], distance)
+                    combined[pair][1] = min(combined[pair][1], steps)
+                else:
+                    combined[pair] = [distance, steps]
+        return {pair: (distance, steps) for pair, (distance, steps) in combined.items()}
+
+
+def random_routes(rng: random.Random, num_wires: int, num_moves: int,
+                  max_length: int) -> List[List[str]]:
+    return [[rng.choice("RLUD") + str(rng.randint(0, max_length)) for _ in range(num_moves)]
+            for _ in range(num_wires)]
+
+
+def pairwise_by_crossings(routes: List[List[str]]) -> Dict[WirePair, Best]:
+    """The same as `WireIndex.pairwise`, a pair at a time. For checking."""
+    result = {}
+    for wire1 in range(len(routes)):
+        for wire2 in range(wire1 + 1, len(routes)):
+            pair_crossings = list(crossings(routes[wire1], routes[wire2]))
+            if pair_crossings:
+                result[(wire1, wire2)] = (
+                    min(abs(x) + abs(y) for (x, y), _ in pair_crossings),
+                    min(steps for _, steps in pair_crossings))
+    return result
+
+
+### Tests ###
+
+test_routes = [["R8", "U5", "L5", "D3"], ["U7", "R6", "D4", "L4"], ["L3", "R6"], ["D2"]]
+# wires that only meet at the origin don't cross
+assert WireIndex(test_routes).pairwise() == {(0, 1): (6, 30), (0, 2): (1, 8)}
+# however the board is cut into strips
+random_wires = random_routes(random.Random(24), 12, 15, 8)
+expected_pairwise = pairwise_by_crossings(random_wires)
+for strips in [1, 2, 5, 40]:
+    assert WireIndex(random_wires, strips).pairwise() == expected_pairwise
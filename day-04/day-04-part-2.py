@@ -1,4 +1,5 @@
 from collections import Counter
+from password_count import count_passwords
 
 
 def good_password(password: int) -> bool:
@@ -13,4 +14,8 @@ assert not good_password(123444)
 assert good_password(111122)
 
 
-print("Part 1:", len([passwd for passwd in range(172851, 675869) if good_password(passwd)]))
+# counting directly gives the same as checking every number
+assert count_passwords(172851, 200000, exact_double=True) == \
+    len([passwd for passwd in range(172851, 200000) if good_password(passwd)])
+
+print("Part 2:", count_passwords(172851, 675869, exact_double=True))
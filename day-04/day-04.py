@@ -1,3 +1,6 @@
+from password_count import count_passwords
+
+
 def good_password(password: int) -> bool:
     digits = [int(c) for c in str(password)]
     never_decreases = True
@@ -15,4 +18,8 @@ assert not good_password(223450)
 assert not good_password(123789)
 
 
-print("Part 1:", len([passwd for passwd in range(172851, 675869) if good_password(passwd)]))
+# counting directly gives the same as checking every number
+assert count_passwords(172851, 200000) == \
+    len([passwd for passwd in range(172851, 200000) if good_password(passwd)])
+
+print("Part 1:", count_passwords(172851, 675869))
@@ -0,0 +1,114 @@
+"""
+Counting passwords without checking every number in the range.
+
+A password's digits never decrease, so there are far fewer candidates than numbers: choosing the
+digits of one is choosing a multiset of digits, and they only go in one order. `good_passwords`
+lists them that way. `count_passwords` doesn't list them at all: it goes along the digits of the
+range's bounds, and counts the ways to finish each prefix with a table keyed on the digits left,
+the last digit and how long its run is. That takes milliseconds for any length or base.
+
+Passwords are `length` digits long, padded with leading zeros if they need to be. There are two
+rules for the repeated digit: at least two adjacent digits the same, or (with `exact_double`) a
+run of exactly two.
+"""
+from typing import Iterator, List, Optional, Tuple
+from functools import lru_cache
+import itertools as it
+
+# A run of three or more counts the same however long it is
+LONG_RUN = 3
+
+
+def _digits(number: int, length: int, base: int) -> List[int]:
+    digits = []
+    for _ in range(length):
+        number, digit = divmod(number, base)
+        digits.append(digit)
+    return digits[::-1]
+
+
+def _good_run(run: int, exact_double: bool) -> bool:
+    return run == 2 if exact_double else run >= 2
+
+
+def _next_state(last: int, run: int, doubled: bool, digit: int,
+                exact_double: bool) -> Tuple[int, int, bool]:
+    """(last digit, length of its run, whether a finished run was good) after adding `digit`."""
+    if digit == last and run:
+        return digit, min(run + 1, LONG_RUN), doubled
+    return digit, 1, doubled or _good_run(run, exact_double)
+
+
+@lru_cache(maxsize=None)
+def _completions(digits_left: int, last: int, run: int, doubled: bool, base: int,
+                 exact_double: bool) -> int:
+    """The ways to add `digits_left` more digits, never decreasing, and end up a good password."""
+    if not digits_left:
+        return int(doubled or _good_run(run, exact_double))
+    return sum(_completions(digits_left - 1, *_next_state(last, run, doubled, digit, exact_double),
+                            base, exact_double)
+               for digit in range(last, base))
+
+
+def _count_below(bound: int, length: int, base: int, exact_double: bool) -> int:
+    """How many good `length` digit passwords are less than `bound`."""
+    if bound <= 0:
+        return 0
+    if bound >= base ** length:
+        return _completions(length, 0, 0, False, base, exact_double)
+    total = 0
+    last, run, doubled = 0, 0, False
+    for idx, bound_digit in enumerate(_digits(bound, length, base)):
+        # passwords that match the bound up to here and then have a smaller digit
+        for digit in range(last, bound_digit):
+            total += _completions(length - idx - 1,
+                                  *_next_state(last, run, doubled, digit, exact_double),
+                                  base, exact_double)
+        if bound_digit < last:
+            # no password starts with the bound's digits so far
+            break
+        last, run, doubled = _next_state(last, run, doubled, bound_digit, exact_double)
+    return total
+
+
+def count_passwords(start: int, stop: int, length: Optional[int] = None, base: int = 10,
+                    exact_double: bool = False) -> int:
+    """
+    How many good passwords there are from `start` up to but not including `stop`, like `range`.
+    By default they're as long as `stop - 1` written in `base`.
+    """
+    if length is None:
+        length = 1
+        while base ** length <= stop - 1:
+            length += 1
+    return _count_below(stop, length, base, exact_double) - \
+        _count_below(max(start, 0), length, base, exact_double)
+
+
+def good_passwords(start: int, stop: int, length: int, base: int = 10,
+                   exact_double: bool = False) -> Iterator[int]:
+    """
+    The good passwords from `start` up to `stop`, in order, only trying digits that never go down.
+    """
+    for digits in it.combinations_with_replacement(range(base), length):
+        runs = [len(list(group)) for _, group in it.groupby(digits)]
+        if any(_good_run(run, exact_double) for run in runs):
+            password = 0
+            for digit in digits:
+                password = password * base + digit
+            if start <= password < stop:
+                yield password
+
+
+### Tests ###
+
+assert count_passwords(111111, 111112) == 1
+assert count_passwords(111111, 111112, exact_double=True) == 0
+assert count_passwords(112233, 112234, exact_double=True) == 1
+assert count_passwords(0, 10 ** 6, length=6) == len(list(good_passwords(0, 10 ** 6, 6)))
+for test_start, test_stop, test_length, test_base in [(172851, 675869, 6, 10), (5, 4000, 4, 10),
+                                                      (0, 4 ** 7, 7, 4), (300, 3000, 5, 7),
+                                                      (0, 2 ** 10, 10, 2)]:
+    for exact in [False, True]:
+        assert count_passwords(test_start, test_stop, test_length, test_base, exact) == \
+            len(list(good_passwords(test_start, test_stop, test_length, test_base, exact)))
@@ -1,27 +1,48 @@
 from typing import List
 import itertools as it
-from intcode_computer import IntcodeComputer
+import asyncio
+import sys
+sys.path.append("..")
+from intcode import BACKENDS, DEFAULT_BACKEND, IntcodeComputer
+from intcode.network import IntcodeNetwork
+from intcode.loader import load_program
 
 
-def thruster_signal(program: List[int], phase_setting: List[int]) -> int:
+def boot_amp(program: List[int]) -> IntcodeComputer:
+    # every amp runs the same setup code until it first asks for input, so we only do it once
+    amp = IntcodeComputer(program, **BACKENDS[DEFAULT_BACKEND])
+    amp.run()
+    return amp
+
+
+def amp_network(booted_amp: IntcodeComputer, phase_setting: List[int]) -> IntcodeNetwork:
     # first time an amp asks for input, give it the phase signal. After that, it's all signals
-    # from previous amps. Halt when the last amp halts.
-    amps = [IntcodeComputer(program) for _ in range(5)]
+    # from previous amps, with the first amp starting off with 0.
+    amps = IntcodeNetwork()
     for amp_idx in range(5):
-        amps[amp_idx].run(phase_setting[amp_idx])
+        amps.add(amp_idx, booted_amp.fork(), inputs=[phase_setting[amp_idx]])
+        amps.connect(amp_idx, (amp_idx + 1) % 5)
+    amps.send(0, 0)
+    return amps
 
-    # hacky, but we prime last amp with 0 so first amp will use 0 as input
-    amps[4].outputs.append(0)
-    for amp_idx in it.cycle(range(5)):
-        prev_amp = amps[(amp_idx - 1) % 5]
-        amp_halted = amps[amp_idx].run(prev_amp.outputs[-1])
-        if amp_halted and amp_idx == 4:
-            return amps[amp_idx].outputs[-1]
+
+def thruster_signal(program: List[int], phase_setting: List[int]) -> int:
+    amps = amp_network(boot_amp(program), phase_setting)
+    asyncio.run(amps.run())
+    return amps.last_outputs[4]
 
 
 def max_thruster_signal(program: List[int]) -> int:
-    return max(thruster_signal(program, phase_setting)
-               for phase_setting in it.permutations(range(5, 10)))
+    # all the phase settings' networks run side by side in the one event loop
+    booted_amp = boot_amp(program)
+    networks = [amp_network(booted_amp, phase_setting)
+                for phase_setting in it.permutations(range(5, 10))]
+
+    async def run_networks():
+        await asyncio.gather(*(amps.run() for amps in networks))
+
+    asyncio.run(run_networks())
+    return max(amps.last_outputs[4] for amps in networks)
 
 
 program1 = [3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5]
@@ -35,6 +56,5 @@ assert max_thruster_signal(program1) == 139629729
 assert thruster_signal(program2, phase_setting2) == 18216
 assert max_thruster_signal(program2) == 18216
 
-with open("input.txt") as f:
-    program = [int(n) for n in f.read().strip().split(",")]
-    print("Part 2:", max_thruster_signal(program))
+program = load_program("input.txt")
+print("Part 2:", max_thruster_signal(program))
@@ -1,6 +1,8 @@
 from typing import List
+import sys
 import numpy as np
-from matplotlib import pyplot as plt
+sys.path.append("..")
+from rendering import output_image
 
 Layer = List[int]
 
@@ -38,6 +40,5 @@ with open("input.txt") as f:
     max_layer = layer_with_fewest_zeros(image_layers)
     print("Part 1:", max_layer.count(1) * max_layer.count(2))
     print("Part 2:")
-    decoded_image = np.reshape(full_image(image_layers), (6, 25))
-    plt.imshow(decoded_image)
-    plt.show()
+    # `--show` shows it in a window, `--save image.png` saves it
+    output_image(np.reshape(full_image(image_layers), (6, 25)))
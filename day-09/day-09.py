@@ -1,10 +1,26 @@
-from intcode_computer import IntcodeComputer
+import sys
+sys.path.append("..")
+from intcode import BACKENDS, IntcodeComputer, preferred_backend
+from intcode.loader import load_program
+from intcode.memo import RUN_CACHE_DIR, MemoizedRunner
 
-with open("input.txt") as f:
-    program = [int(num) for num in f.read().strip().split(",")]
-    computer1 = IntcodeComputer(program)
-    computer1.run(1)
-    print("Part 1:", computer1.outputs[-1])
-    computer2 = IntcodeComputer(program)
-    computer2.run(2)
-    print("Part 2:", computer2.outputs[-1])
+# `python day-09.py --profile` prints a profile of each run. `--no-cache` runs the program again
+# rather than reading back the answers from last time.
+PROFILE = "--profile" in sys.argv
+NO_CACHE = "--no-cache" in sys.argv
+# the BOOST program runs for a while, so compiling it pays off
+BACKEND = preferred_backend("compiled")
+
+program = load_program("input.txt")
+if PROFILE:
+    for part in [1, 2]:
+        computer = IntcodeComputer(program, **BACKENDS[BACKEND])
+        computer.enable_profiling()
+        computer.run(part)
+        print(f"Part {part}:", computer.outputs[-1])
+        print(f"Part {part} profile:", computer.profile.to_json())
+else:
+    # the BOOST runs give the same answer every time, so after the first time they're read back
+    runner = MemoizedRunner(cache_dir=None if NO_CACHE else RUN_CACHE_DIR, backend=BACKEND)
+    print("Part 1:", runner.run(program, [1])[-1])
+    print("Part 2:", runner.run(program, [2])[-1])
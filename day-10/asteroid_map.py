@@ -0,0 +1,107 @@
+"""
+Loading asteroid maps straight from their files.
+
+The file is memory mapped and compared with "#" a byte at a time by NumPy, with no splitting into
+strings. Maps can be any width and height, as long as every row has the same width. For maps too
+big to handle at once, `asteroid_bands` goes through the file a band of rows at a time, so only
+that band's pages need to be read in.
+"""
+from typing import Iterator, Tuple
+import mmap
+import os
+import tempfile
+import numpy as np
+
+ASTEROID = ord("#")
+# rows per band, when loading the whole map
+BAND_ROWS = 4096
+
+
+def _map_shape(mapped: mmap.mmap) -> Tuple[int, int, bytes]:
+    """The map's width and height, and the line ending after each row."""
+    width = mapped.find(b"\n")
+    line_end = b"\n"
+    if width == -1:
+        width = len(mapped)
+    elif width and mapped[width - 1] == ord("\r"):
+        width -= 1
+        line_end = b"\r\n"
+    # the last row might not end with a newline, and there might be blank lines after it
+    end = len(mapped)
+    while end and mapped[end - 1] in b"\r\n":
+        end -= 1
+    stride = width + len(line_end)
+    height = (end + len(line_end)) // stride
+    if height * stride != end + len(line_end):
+        raise ValueError("The rows of the asteroid map aren't all the same width.")
+    return width, height, line_end
+
+
+def asteroid_bands(path: str, band_rows: int = BAND_ROWS) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    The first row of each band of `band_rows` rows, and the (x, y) of the band's asteroids as an
+    (n, 2) array in order of x and then y.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        width, height, line_end = _map_shape(mapped)
+        stride = width + len(line_end)
+        data = np.frombuffer(mapped, dtype=np.uint8)
+        try:
+            for start in range(0, height, band_rows):
+                rows = min(band_rows, height - start)
+                # views of the mapped file: the band's rows, and the line endings between them
+                band = np.lib.stride_tricks.as_strided(data[start * stride:], (rows, width),
+                                                       (stride, 1), writeable=False)
+                ends = np.lib.stride_tricks.as_strided(
+                    data[start * stride + width:], (min(rows, height - 1 - start), len(line_end)),
+                    (stride, 1), writeable=False)
+                ragged = (band == ord("\n")).any() or \
+                    (ends != np.frombuffer(line_end, dtype=np.uint8)).any()
+                xs, ys = np.nonzero(band.T == ASTEROID)
+                del band, ends
+                if ragged:
+                    raise ValueError("The rows of the asteroid map aren't all the same width.")
+                yield start, np.stack([xs, ys + start], axis=1).astype(np.int64)
+        finally:
+            # the map can't be closed while NumPy still has a view of it
+            del data
+
+
+def load_asteroids(path: str, band_rows: int = BAND_ROWS) -> np.ndarray:
+    """The (x, y) of every asteroid in the map file at `path`, in order of x and then y."""
+    bands = [positions for _, positions in asteroid_bands(path, band_rows)]
+    if not bands:
+        return np.empty((0, 2), dtype=np.int64)
+    positions = np.concatenate(bands)
+    return positions[np.lexsort((positions[:, 1], positions[:, 0]))]
+
+
+### Tests ###
+
+with tempfile.TemporaryDirectory() as map_dir:
+    map_path = os.path.join(map_dir, "map.txt")
+    for line_end in ["\n", "\r\n"]:
+        with open(map_path, "w", newline="") as f:
+            f.write(line_end.join(["#..#.##", ".#.....", "......#"]) + line_end)
+        expected = [[0, 0], [1, 1], [3, 0], [5, 0], [6, 0], [6, 2]]
+        assert load_asteroids(map_path).tolist() == expected
+        assert load_asteroids(map_path, band_rows=2).tolist() == expected
+        assert [(start, positions.tolist()) for start, positions in asteroid_bands(map_path, 2)] \
+            == [(0, [[0, 0], [1, 1], [3, 0], [5, 0], [6, 0]]), (2, [[6, 2]])]
+
+    # a tall map without a newline at the end
+    with open(map_path, "w") as f:
+        f.write("#.\n..\n.#\n#.\n.#")
+    assert load_asteroids(map_path, band_rows=3).tolist() == [[0, 0], [0, 3], [1, 2], [1, 4]]
+
+    # ragged rows, including ones that add up to a whole number of rows
+    for ragged_map in ["#..\n.#\n", "##\n#\n###"]:
+        with open(map_path, "w") as f:
+            f.write(ragged_map)
+        try:
+            load_asteroids(map_path)
+            assert False, "ragged rows should be an error"
+        except ValueError:
+            pass
@@ -1,6 +1,9 @@
-from typing import List, Tuple, Iterator, DefaultDict
-import math
-from collections import defaultdict, deque
+from typing import List, Tuple, Iterator
+import numpy as np
+from asteroid_map import load_asteroids
+from parallel_scoring import top_stations
+from visibility import asteroid_positions, best_station, vaporization_order, vaporized, \
+    visible_counts
 
 
 def parse(puzzle: str) -> List[str]:
@@ -8,60 +11,22 @@ def parse(puzzle: str) -> List[str]:
 
 
 def get_asteroids(asteroid_field) -> List[Tuple[int, int]]:
-    field_width = len(asteroid_field)
-    return [(x, y) for x in range(field_width) for y in range(field_width)
+    return [(x, y) for x in range(len(asteroid_field[0])) for y in range(len(asteroid_field))
             if asteroid_field[y][x] == '#']
 
 
-def displacement_vector(start: Tuple[int, int], end: Tuple[int, int]) -> Tuple[float, float]:
-    # just using the polar coordinates
-    rise = end[0] - start[0]
-    run = end[1] - start[1]
-    phi = math.atan2(-run, -rise)
-    r = math.sqrt(rise**2 + run**2)
-    return round(phi, 10), round(r, 10)
-
-
 def asteroids_detected(center: Tuple[int, int], asteroid_field: List[str]) -> int:
-    lines_of_sight = {displacement_vector(center, target)[0]
-                      for target in get_asteroids(asteroid_field) if target != center}
-    return len(lines_of_sight)
+    return int(visible_counts(asteroid_positions(asteroid_field), np.array([center]))[0])
 
 
 def best_location(asteroid_field: List[str]) -> Tuple[int, int]:
-    asteroids = get_asteroids(asteroid_field)
-    return max(asteroids,
-               key=lambda asteroid: asteroids_detected(asteroid, asteroid_field))
+    return best_station(asteroid_positions(asteroid_field))[0]
 
 
 def vaporized_asteroids(asteroid_field: List[str]) -> Iterator[Tuple[int, int]]:
-    asteroids = get_asteroids(asteroid_field)
-    laser = best_location(asteroid_field)
-    asteroids_left: DefaultDict[float, List[Tuple[float, Tuple[int, int]]]] = defaultdict(list)
-    for asteroid in asteroids:
-        if asteroid != laser:
-            phi, r = displacement_vector(laser, asteroid)
-            asteroids_left[phi].append((r, asteroid))
-    for los_asteroids in asteroids_left.values():
-        # reverse, since we'll be popping off the end
-        los_asteroids.sort(reverse=True)
-
-    # We start at 12 o'clock rather than 3, and go clockwise, when lasering stuff:
-    def transformed_phi(phi: float) -> float:
-        return ((5 * math.pi / 2) - phi) % (2 * math.pi)
-
-    sorted_phis = sorted(asteroids_left, key=transformed_phi, reverse=True)
-
-    while asteroids_left:
-        for phi in sorted_phis:
-            if phi not in asteroids_left:
-                continue
-            los_asteroids = asteroids_left[phi]
-            # we yield the next nearest (by `r`) asteroid
-            yield los_asteroids.pop()[1]
-            if not los_asteroids:
-                # we've exhausted this line of sight
-                asteroids_left.pop(phi)
+    order = vaporization_order(best_location(asteroid_field), asteroid_positions(asteroid_field))
+    for x, y in order.tolist():
+        yield x, y
 
 
 test_case1 = parse(""".#..#
@@ -129,6 +94,11 @@ test_case5 = parse(""".#..##.###...#######
 ###.##.####.##.#..##
 """)
 
+# a field wider than it is tall
+assert get_asteroids(parse("#..#\n.#..")) == [(0, 0), (1, 1), (3, 0)]
+assert get_asteroids(test_case5) == [tuple(position) for position in
+                                     asteroid_positions(test_case5).tolist()]
+
 assert (best_loc1 := best_location(test_case1)) == (3, 4)
 assert asteroids_detected(best_loc1, test_case1) == 8
 assert (best_loc2 := best_location(test_case2)) == (5, 8)
@@ -156,8 +126,23 @@ actual_order = list(vaporized_asteroids(test_case5))
 
 for vapor_idx, asteroid_loc in ideal_order:
     assert actual_order[vapor_idx] == asteroid_loc
-
-with open("input.txt") as f:
-    puzzle_input = parse(f.read().strip())
-    print("Part 1:", asteroids_detected(best_location(puzzle_input), puzzle_input))
-    print("Part 2:", list(vaporized_asteroids(puzzle_input))[199])
+# asking for just the ones we want
+assert vaporized(best_location(test_case5), asteroid_positions(test_case5),
+                 [vapor_idx for vapor_idx, _ in ideal_order]) == [loc for _, loc in ideal_order]
+
+# the scoring pool's workers may import this module, so they mustn't run the puzzle themselves
+if __name__ == "__main__":
+    # the pool gives the same ranking as scoring on one core
+    random_field = ["".join(row) for row in np.random.default_rng(21).choice(
+        [".", "#"], size=(40, 30), p=[0.6, 0.4])]
+    random_asteroids = asteroid_positions(random_field)
+    random_counts = visible_counts(random_asteroids)
+    top_five = sorted(zip((-random_counts).tolist(), range(len(random_asteroids))))[:5]
+    assert top_stations(random_asteroids, k=5, processes=2, tile_size=7) == \
+        [(tuple(random_asteroids[idx].tolist()), -count) for count, idx in top_five]
+    assert top_stations(asteroid_positions(test_case5), processes=3)[0] == ((11, 13), 210)
+
+    asteroids = load_asteroids("input.txt")
+    [(laser, detected)] = top_stations(asteroids)
+    print("Part 1:", detected)
+    print("Part 2:", vaporized(laser, asteroids, [199])[0])
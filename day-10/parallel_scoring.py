@@ -0,0 +1,77 @@
+"""
+Scoring every candidate station across a pool of processes.
+
+The asteroid positions are copied once into shared memory, which each worker maps as a NumPy
+array, so only the candidate stations' indices go to the workers with each task. The candidates
+are split into square tiles of the field, several per process, so a process that finishes its
+tiles early picks up more rather than waiting on the slowest.
+"""
+from typing import List, Optional, Tuple
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from visibility import Position, visible_counts
+
+# Set in each worker when the pool starts
+_shared: Optional[shared_memory.SharedMemory] = None
+_asteroids: Optional[np.ndarray] = None
+
+
+def _init_worker(name: str, num_asteroids: int) -> None:
+    global _shared, _asteroids
+    _shared = shared_memory.SharedMemory(name=name)
+    _asteroids = np.ndarray((num_asteroids, 2), dtype=np.int64, buffer=_shared.buf)
+
+
+def _score_tile(station_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return station_indices, visible_counts(_asteroids, _asteroids[station_indices])
+
+
+def tiles(asteroids: np.ndarray, tile_size: int) -> List[np.ndarray]:
+    """The indices of the asteroids in each `tile_size` square of the field that has any."""
+    tile_keys = (asteroids // tile_size).tolist()
+    by_tile = {}
+    for idx, key in enumerate(tile_keys):
+        by_tile.setdefault(tuple(key), []).append(idx)
+    return [np.array(indices, dtype=np.int64) for indices in by_tile.values()]
+
+
+def top_stations(asteroids: np.ndarray, k: int = 1, processes: Optional[int] = None,
+                 tile_size: Optional[int] = None) -> List[Tuple[Position, int]]:
+    """
+    The `k` asteroids that see the most others, best first, with how many each sees. Ties go to
+    the one first in x, y order, like `best_station`.
+    """
+    processes = processes or mp.cpu_count()
+    if tile_size is None:
+        # about four tiles per process
+        extent = int(asteroids.max(initial=0)) + 1
+        tile_size = max(1, int(np.ceil(extent / np.sqrt(4 * processes))))
+    asteroids = np.ascontiguousarray(asteroids, dtype=np.int64)
+    counts = np.zeros(len(asteroids), dtype=np.int64)
+
+    shared = shared_memory.SharedMemory(create=True, size=max(1, asteroids.nbytes))
+    try:
+        np.ndarray(asteroids.shape, dtype=np.int64, buffer=shared.buf)[:] = asteroids
+        with mp.Pool(processes, initializer=_init_worker,
+                     initargs=(shared.name, len(asteroids))) as pool:
+            for station_indices, tile_counts in pool.imap_unordered(_score_tile,
+                                                                     tiles(asteroids, tile_size)):
+                counts[station_indices] = tile_counts
+    finally:
+        shared.close()
+        shared.unlink()
+
+    # a stable sort keeps equal counts in x, y order
+    best = np.argsort(-counts, kind="stable")[:k]
+    return [((x, y), count)
+            for (x, y), count in zip(asteroids[best].tolist(), counts[best].tolist())]
+
+
+### Tests ###
+
+# the pool is tried out in day-10.py, since starting one here would start one in every worker too
+field_tiles = tiles(np.array([[0, 0], [4, 1], [1, 3], [3, 3], [9, 9]]), tile_size=3)
+assert [indices.tolist() for indices in field_tiles] == [[0], [1], [2], [3], [4]]
+field_tiles = tiles(np.array([[0, 0], [4, 1], [1, 3], [3, 3], [9, 9]]), tile_size=4)
+assert [indices.tolist() for indices in field_tiles] == [[0, 2, 3], [1], [4]]
@@ -0,0 +1,148 @@
+"""
+Counting the asteroids each station can see, for every station at once.
+
+Two asteroids are in the same line of sight from a station when their displacements from it
+reduce to the same direction after dividing by the gcd of the two components. Keeping to integers
+means no two directions can be mixed up by rounding, however big the field. Each reduced direction
+is packed into one int64 key, so the number of lines of sight from a station is the number of
+distinct keys in its row, found by sorting the rows.
+"""
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+Position = Tuple[int, int]
+
+# stations per chunk are chosen so a chunk's arrays have about this many entries
+CHUNK_ENTRIES = 2 ** 22
+
+
+def asteroid_positions(asteroid_field: Sequence[str]) -> np.ndarray:
+    """The (x, y) of each asteroid, in order of x and then y, as an (n, 2) array."""
+    grid = np.array([list(row) for row in asteroid_field]) == "#"
+    # transposing puts x first, so the nonzero positions come out by x and then y
+    xs, ys = np.nonzero(grid.T)
+    return np.stack([xs, ys], axis=1).astype(np.int64)
+
+
+def direction_keys(stations: np.ndarray, asteroids: np.ndarray) -> np.ndarray:
+    """
+    A (stations, asteroids) array with the key of the reduced direction from each station to each
+    asteroid, or -1 where they're the same asteroid.
+    """
+    dx = asteroids[:, 0] - stations[:, 0, np.newaxis]
+    dy = asteroids[:, 1] - stations[:, 1, np.newaxis]
+    divisor = np.gcd(dx, dy)
+    same = divisor == 0
+    divisor[same] = 1
+    dx //= divisor
+    dy //= divisor
+    # every component is within `extent` of 0, so this packs each direction into a unique key
+    extent = int(max(np.abs(dx).max(initial=0), np.abs(dy).max(initial=0))) + 1
+    keys = (dx + extent) * (2 * extent + 1) + (dy + extent)
+    keys[same] = -1
+    return keys
+
+
+def visible_counts(asteroids: np.ndarray, stations: Optional[np.ndarray] = None,
+                   chunk_entries: int = CHUNK_ENTRIES) -> np.ndarray:
+    """How many of `asteroids` can be seen from each of `stations` (by default, every asteroid)."""
+    stations = asteroids if stations is None else stations
+    counts = np.empty(len(stations), dtype=np.int64)
+    chunk = max(1, chunk_entries // max(1, len(asteroids)))
+    for start in range(0, len(stations), chunk):
+        keys = direction_keys(stations[start:start + chunk], asteroids)
+        keys.sort(axis=1)
+        distinct = 1 + np.count_nonzero(np.diff(keys, axis=1), axis=1)
+        # the station itself is counted as a key of its own when it's one of the asteroids
+        counts[start:start + chunk] = distinct - (keys[:, 0] == -1)
+    return counts
+
+
+def best_station(asteroids: np.ndarray) -> Tuple[Position, int]:
+    """The asteroid that sees the most others (the first in x, y order on a tie), and how many."""
+    counts = visible_counts(asteroids)
+    best = int(np.argmax(counts))
+    x, y = asteroids[best].tolist()
+    return (x, y), int(counts[best])
+
+
+def vaporization_order(laser: Position, asteroids: np.ndarray) -> np.ndarray:
+    """
+    The asteroids in the order the laser vaporizes them, as an (n, 2) array. It starts pointing up
+    and turns clockwise, hitting the nearest asteroid left in each line of sight as it passes.
+
+    So an asteroid goes in the rotation given by how many asteroids are in front of it in its line
+    of sight, and within a rotation, in order of angle. Sorting on those two gives the whole order
+    without simulating the laser.
+    """
+    station = np.array([laser])
+    asteroids = asteroids[(asteroids != station).any(axis=1)]
+    keys = direction_keys(station, asteroids)[0]
+    dx = asteroids[:, 0] - laser[0]
+    dy = asteroids[:, 1] - laser[1]
+    # how far along its line of sight each asteroid is, in steps of the reduced direction
+    steps = np.gcd(dx, dy)
+    # the number of asteroids in front of each one: its position in its line of sight's group
+    by_line = np.lexsort((steps, keys))
+    sorted_keys = keys[by_line]
+    group_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(keys)])
+    rotation = np.empty(len(keys), dtype=np.int64)
+    rotation[by_line] = np.arange(len(keys)) - np.repeat(group_starts, group_sizes)
+    # Clockwise from up, with y increasing downwards. The angles are of the reduced directions, so
+    # asteroids in the same line of sight get exactly the same angle, and different lines of sight
+    # on a grid this size are much further apart than float rounding.
+    angle = np.arctan2(dx // steps, -(dy // steps)) % (2 * np.pi)
+    return asteroids[np.lexsort((angle, rotation))]
+
+
+def vaporized(laser: Position, asteroids: np.ndarray, ks: Sequence[int]) -> List[Position]:
+    """The `k`th asteroid to be vaporized (counting from 0), for each of `ks`."""
+    order = vaporization_order(laser, asteroids)
+    return [(x, y) for x, y in order[np.asarray(ks, dtype=np.int64)].tolist()]
+
+
+### Tests ###
+
+def _brute_force_counts(positions: List[Position]) -> List[int]:
+    from math import gcd
+    counts = []
+    for sx, sy in positions:
+        directions = set()
+        for x, y in positions:
+            if (x, y) != (sx, sy):
+                divisor = gcd(x - sx, y - sy)
+                directions.add(((x - sx) // divisor, (y - sy) // divisor))
+        counts.append(len(directions))
+    return counts
+
+
+test_field = [".#..#",
+              ".....",
+              "#####",
+              "....#",
+              "...##"]
+test_asteroids = asteroid_positions(test_field)
+assert test_asteroids.tolist()[:3] == [[0, 2], [1, 0], [1, 2]]
+assert visible_counts(test_asteroids).tolist() == [6, 7, 7, 7, 7, 8, 7, 5, 7, 7]
+# from a point that isn't an asteroid
+assert visible_counts(test_asteroids, np.array([[0, 0]])).tolist() == [8]
+assert best_station(test_asteroids) == ((3, 4), 8)
+
+rng = np.random.default_rng(10)
+random_field = ["".join(row) for row in rng.choice([".", "#"], size=(30, 40), p=[0.7, 0.3])]
+random_asteroids = asteroid_positions(random_field)
+assert visible_counts(random_asteroids).tolist() == \
+    _brute_force_counts([tuple(position) for position in random_asteroids.tolist()])
+# the laser's first rotation misses the asteroid behind (1, 1), and gets it on the second
+laser_field = ["###",
+               "##.",
+               ".#.",
+               "##."]
+laser_order = [(1, 1), (2, 0), (1, 3), (0, 3), (0, 1), (0, 0), (1, 0)]
+assert vaporized((1, 2), asteroid_positions(laser_field), range(7)) == laser_order
+assert vaporized((1, 2), asteroid_positions(laser_field), [6, 0]) == [(1, 0), (1, 1)]
+
+# a few stations at a time gives the same counts
+assert (visible_counts(random_asteroids, chunk_entries=3 * len(random_asteroids)) ==
+        visible_counts(random_asteroids)).all()
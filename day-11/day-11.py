@@ -1,55 +1,60 @@
-from collections import defaultdict
-from intcode_computer import IntcodeComputer
-from matplotlib import pyplot as plt
+import sys
+sys.path.append("..")
+from intcode import BACKENDS, DEFAULT_BACKEND, IntcodeComputer
+from intcode.loader import load_program
+from hull import Hull
+from rendering import output_image
 
+# `python day-11.py --profile` prints a profile of each robot's run. `--show` shows the part 2
+# registration identifier in a window, and `--save image.png` saves it.
+PROFILE = "--profile" in sys.argv
 
-def update_position(position, direction):
-    return {0: (position[0], position[1] + 1),  # N
-            1: (position[0] + 1, position[1]),  # E
-            2: (position[0], position[1] - 1),  # S
-            3: (position[0] - 1, position[1]),  # W
-            }[direction]
+
+# NESW
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
 
 
 def paint_hull(program, start_color):
-    computer = IntcodeComputer(program)
-    # NESW
     direction = 0
     position = (0, 0)
-    panel_colors = defaultdict(int)
-    panel_colors[position] = start_color
-    panels_painted = 1
-
-    def new_direction(turn_right: int):
-        if turn_right:
-            return (direction + 1) % 4
-        else:
-            return (direction - 1) % 4
-
-    while not computer.run(panel_colors[position]):
-        paint_color = computer.outputs[-2]
-        turn_right = computer.outputs[-1]
-        panel_colors[position] = paint_color
-        direction = new_direction(turn_right)
-        position = update_position(position, direction)
-        if position not in panel_colors:
-            panels_painted += 1
-
-    return panels_painted, panel_colors
-
-
-with open("input.txt") as f:
-    program = [int(n) for n in f.read().strip().split(",")]
-    panels_painted, _ = paint_hull(program, start_color=0)
-    print("Part 1:", panels_painted)
-
-    # Part 2
-    _, panel_colors = paint_hull(program, start_color=1)
-    positions = panel_colors.keys()
-    x_vals, y_vals = zip(*positions)
-    start_x, end_x = min(x_vals), max(x_vals) + 1
-    start_y, end_y = min(y_vals), max(y_vals) + 1
-    color_arr = [[panel_colors[(x, y)] for x in (range(start_x, end_x))]
-                 for y in reversed(range(start_y, end_y))]
-    plt.imshow(color_arr)
-    plt.show()
+    hull = Hull()
+    hull.visit(position)
+    hull[position] = start_color
+
+    # The robot's camera and motor are hooked straight up to the computer, so it runs in one go.
+    def camera():
+        while True:
+            yield hull[position]
+
+    instruction = []
+
+    def motor(value: int):
+        nonlocal direction, position
+        instruction.append(value)
+        if len(instruction) < 2:
+            return
+        paint_color, turn_right = instruction
+        instruction.clear()
+        hull[position] = paint_color
+        direction = (direction + (1 if turn_right else -1)) % 4
+        dx, dy = DIRECTIONS[direction]
+        position = (position[0] + dx, position[1] + dy)
+        hull.visit(position)
+
+    # the robot's runs are short enough that compiling blocks doesn't pay off
+    computer = IntcodeComputer(program, **BACKENDS[DEFAULT_BACKEND], outputs=motor)
+    computer.feed(camera())
+    if PROFILE:
+        computer.enable_profiling()
+    computer.run()
+    if PROFILE:
+        print(computer.profile.to_json())
+
+    return hull
+
+
+program = load_program("input.txt")
+print("Part 1:", len(paint_hull(program, start_color=0)))
+
+print("Part 2:")
+output_image(paint_hull(program, start_color=1).to_array())
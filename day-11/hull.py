@@ -0,0 +1,100 @@
+from typing import Tuple
+import numpy as np
+
+Position = Tuple[int, int]
+
+# Each panel is one byte: its color in the low bit, and whether the robot has been there.
+COLOR = 1
+VISITED = 2
+
+
+class Hull:
+    """
+    The panels of the hull, in a flat grid that doubles in size (keeping the old panels in the
+    middle) whenever the robot walks off its edge. The visited panels' count and bounding box are
+    kept up to date as the robot goes, rather than worked out from all the panels at the end.
+    """
+    def __init__(self, size: int = 64):
+        self.width = self.height = size
+        # the grid index of (0, 0) is `offset_y * width + offset_x`
+        self.offset_x = self.offset_y = size // 2
+        self.cells = bytearray(size * size)
+        self.num_visited = 0
+        # min x, min y, max x, max y of the visited panels
+        self.bounds = (0, 0, -1, -1)
+
+    def _index(self, position: Position) -> int:
+        x = position[0] + self.offset_x
+        y = position[1] + self.offset_y
+        while not (0 <= x < self.width and 0 <= y < self.height):
+            self._grow()
+            x = position[0] + self.offset_x
+            y = position[1] + self.offset_y
+        return y * self.width + x
+
+    def _grow(self) -> None:
+        width, height = self.width * 2, self.height * 2
+        shift_x, shift_y = self.width // 2, self.height // 2
+        cells = bytearray(width * height)
+        for row in range(self.height):
+            start = (row + shift_y) * width + shift_x
+            cells[start:start + self.width] = self.cells[row * self.width:(row + 1) * self.width]
+        self.cells = cells
+        self.width, self.height = width, height
+        self.offset_x += shift_x
+        self.offset_y += shift_y
+
+    def __getitem__(self, position: Position) -> int:
+        # the index first, as it might grow a new grid
+        idx = self._index(position)
+        return self.cells[idx] & COLOR
+
+    def __setitem__(self, position: Position, color: int) -> None:
+        idx = self._index(position)
+        self.cells[idx] = (self.cells[idx] & VISITED) | color
+
+    def visit(self, position: Position) -> bool:
+        """Marks `position` as visited, returning whether it's the first time."""
+        idx = self._index(position)
+        if self.cells[idx] & VISITED:
+            return False
+        self.cells[idx] |= VISITED
+        self.num_visited += 1
+        x, y = position
+        min_x, min_y, max_x, max_y = self.bounds
+        if self.num_visited == 1:
+            self.bounds = (x, y, x, y)
+        else:
+            self.bounds = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+        return True
+
+    def __len__(self) -> int:
+        return self.num_visited
+
+    def to_array(self) -> np.ndarray:
+        """The colors of the visited panels' bounding box, with north (larger y) at the top."""
+        min_x, min_y, max_x, max_y = self.bounds
+        grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+        box = grid[min_y + self.offset_y:max_y + self.offset_y + 1,
+                   min_x + self.offset_x:max_x + self.offset_x + 1]
+        return (box[::-1] & COLOR).copy()
+
+
+### Tests ###
+
+hull = Hull(size=2)
+assert hull.visit((0, 0)) and not hull.visit((0, 0))
+hull[(0, 0)] = 1
+# far off the starting grid, in every direction
+for position in [(5, 0), (-7, 3), (0, -9)]:
+    assert hull[position] == 0
+    assert hull.visit(position)
+hull[(-7, 3)] = 1
+assert hull[(0, 0)] == 1 and hull[(-7, 3)] == 1 and hull[(5, 0)] == 0
+assert len(hull) == 4 and hull.bounds == (-7, -9, 5, 3)
+image = hull.to_array()
+assert image.shape == (13, 13)
+assert image[0, 0] == 1 and image[3, 7] == 1 and image.sum() == 2
+# painting doesn't visit, and visiting doesn't paint
+hull[(1, 1)] = 1
+assert len(hull) == 4 and hull.visit((1, 1)) and hull[(1, 1)] == 1
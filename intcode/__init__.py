@@ -0,0 +1,13 @@
+"""
+The Intcode computer shared by every day's solution.
+
+`IntcodeComputer` is the full machine; `run_intcode` runs a program to completion on one of the
+`BACKENDS`. The NumPy batch runner, the asyncio network and saving computers to disk are in
+`intcode.batch`, `intcode.network` and `intcode.checkpoint`.
+"""
+from intcode.computer import BACKENDS, DEFAULT_BACKEND, IntcodeComputer, OutputSink, Snapshot, \
+    preferred_backend, run_intcode
+from intcode.instructions import DISPATCH_TABLE, Instruction, decode, parse_instruction
+from intcode.memory import DictMemory, FlatMemory, Memory
+from intcode.profiling import Profile
+
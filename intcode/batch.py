@@ -0,0 +1,226 @@
+"""
+Running many copies of one program at once with NumPy. Lanes it can't run are finished on the
+package's `IntcodeComputer`, so there's only the one interpreter to keep in step with.
+"""
+from typing import List, Sequence, Optional, Dict
+import numpy as np
+from intcode.computer import IntcodeComputer
+from intcode.instructions import DISPATCH_TABLE, parse_instruction
+
+# Operands at least this big might overflow an int64 when added/multiplied, so those lanes go to the
+# scalar interpreter, which uses Python ints.
+ADD_LIMIT = 2 ** 62
+MUL_LIMIT = 2 ** 31
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _fits(value: int) -> bool:
+    return INT64_MIN <= value <= INT64_MAX
+
+
+class BatchIntcode:
+    """
+    Runs many copies ("lanes") of the same program in lockstep. Memory is a (lanes x size) int64
+    array, and each step executes the next instruction for every lane at the same address at once.
+
+    Lanes that do anything the int64 arrays can't handle (overflow, addresses outside the array)
+    are handed over to an `IntcodeComputer` and finished there. So are lanes that start with a
+    value too big for an int64, in the program, poked in or as an input, which never run here.
+    """
+    def __init__(self, program: List[int], num_lanes: int, extra_memory: int = 1024):
+        self.num_lanes = num_lanes
+        self.memory = np.zeros((num_lanes, len(program) + extra_memory), dtype=np.int64)
+        # values too big for the array are left as 0 there, and kept here by lane and address
+        self.big_values: List[Dict[int, int]] = [{} for _ in range(num_lanes)]
+        self.starts_scalar = np.zeros(num_lanes, dtype=bool)
+        big_words = {addr: value for addr, value in enumerate(program) if not _fits(value)}
+        if big_words:
+            program = [value if _fits(value) else 0 for value in program]
+            for lane_values in self.big_values:
+                lane_values.update(big_words)
+            self.starts_scalar[:] = True
+        self.memory[:, :len(program)] = program
+        self.ptrs = np.zeros(num_lanes, dtype=np.int64)
+        self.relative_bases = np.zeros(num_lanes, dtype=np.int64)
+        self.outputs: List[List[int]] = [[] for _ in range(num_lanes)]
+        # lanes that have been handed over to the scalar interpreter
+        self.scalar_lanes: Dict[int, IntcodeComputer] = {}
+
+    def poke(self, addr: int, values: Sequence[int]) -> None:
+        """Set `addr` to a different value in each lane, before running."""
+        for lane, value in enumerate(values):
+            if _fits(value):
+                self.big_values[lane].pop(addr, None)
+            else:
+                self.big_values[lane][addr] = value
+                self.starts_scalar[lane] = True
+        self.memory[:, addr] = [value if _fits(value) else 0 for value in values]
+
+    def read(self, addr: int) -> List[int]:
+        """The value at `addr` in each lane."""
+        values = (self.memory[:, addr].tolist() if addr < self.memory.shape[1]
+                  else [0] * self.num_lanes)
+        for lane, lane_values in enumerate(self.big_values):
+            if addr in lane_values:
+                values[lane] = lane_values[addr]
+        for lane, computer in self.scalar_lanes.items():
+            values[lane] = computer.memory[addr]
+        return values
+
+    def run(self, inputs: Optional[Sequence[Sequence[int]]] = None) -> List[List[int]]:
+        """
+        Run every lane until it halts or runs out of inputs, where `inputs[lane]` are the inputs
+        for that lane. Returns each lane's outputs.
+        """
+        if inputs is None:
+            inputs = [[] for _ in range(self.num_lanes)]
+        num_inputs = np.array([len(lane_inputs) for lane_inputs in inputs], dtype=np.int64)
+        input_arr = np.zeros((self.num_lanes, max(num_inputs.max(initial=0), 1)), dtype=np.int64)
+        to_scalar = self.starts_scalar.copy()
+        for lane, lane_inputs in enumerate(inputs):
+            if all(_fits(value) for value in lane_inputs):
+                input_arr[lane, :len(lane_inputs)] = lane_inputs
+            else:
+                to_scalar[lane] = True
+        inputs_used = np.zeros(self.num_lanes, dtype=np.int64)
+        active = ~to_scalar
+        mem = self.memory
+        size = mem.shape[1]
+
+        while active.any():
+            live = np.flatnonzero(active)
+            ptrs = self.ptrs[live]
+            # lanes that jumped outside the array
+            outside = (ptrs < 0) | (ptrs >= size)
+            if outside.any():
+                to_scalar[live[outside]] = True
+                active[live[outside]] = False
+                live, ptrs = live[~outside], ptrs[~outside]
+            for ptr in np.unique(ptrs):
+                at_ptr = live[ptrs == ptr]
+                # lanes may have modified their code differently, so group by instruction too
+                words = mem[at_ptr, ptr]
+                for word in np.unique(words):
+                    lanes = at_ptr[words == word]
+                    opcode, *modes = parse_instruction(int(word))
+                    if opcode not in DISPATCH_TABLE:
+                        raise ValueError(f"Bad instruction {word} at address {ptr}.")
+                    num_params = DISPATCH_TABLE[opcode][1]
+                    if ptr + num_params >= size:
+                        to_scalar[lanes] = True
+                        active[lanes] = False
+                        continue
+
+                    addrs = []
+                    for arg_num in range(1, num_params + 1):
+                        mode = modes[arg_num - 1]
+                        if mode == 1:
+                            addrs.append(np.full(len(lanes), ptr + arg_num))
+                        elif mode == 0:
+                            addrs.append(mem[lanes, ptr + arg_num])
+                        else:
+                            addrs.append(mem[lanes, ptr + arg_num] + self.relative_bases[lanes])
+                    if addrs:
+                        in_range = np.logical_and.reduce([(addr >= 0) & (addr < size)
+                                                          for addr in addrs])
+                    else:
+                        in_range = np.ones(len(lanes), dtype=bool)
+                    if opcode in (1, 2):
+                        limit = ADD_LIMIT if opcode == 1 else MUL_LIMIT
+                        a = mem[lanes, np.where(in_range, addrs[0], 0)]
+                        b = mem[lanes, np.where(in_range, addrs[1], 0)]
+                        in_range &= (np.abs(a) < limit) & (np.abs(b) < limit)
+                    if not in_range.all():
+                        to_scalar[lanes[~in_range]] = True
+                        active[lanes[~in_range]] = False
+                        lanes = lanes[in_range]
+                        addrs = [addr[in_range] for addr in addrs]
+                    if not len(lanes):
+                        continue
+                    values = [mem[lanes, addr] for addr in addrs]
+
+                    if opcode == 1:
+                        mem[lanes, addrs[2]] = values[0] + values[1]
+                    elif opcode == 2:
+                        mem[lanes, addrs[2]] = values[0] * values[1]
+                    elif opcode == 3:
+                        has_input = inputs_used[lanes] < num_inputs[lanes]
+                        # lanes out of inputs stop here, like a computer waiting for input
+                        active[lanes[~has_input]] = False
+                        lanes = lanes[has_input]
+                        mem[lanes, addrs[0][has_input]] = input_arr[lanes, inputs_used[lanes]]
+                        inputs_used[lanes] += 1
+                    elif opcode == 4:
+                        for lane, value in zip(lanes.tolist(), values[0].tolist()):
+                            self.outputs[lane].append(value)
+                    elif opcode == 5:
+                        self.ptrs[lanes] = np.where(values[0] != 0, values[1], ptr + 3)
+                        continue
+                    elif opcode == 6:
+                        self.ptrs[lanes] = np.where(values[0] == 0, values[1], ptr + 3)
+                        continue
+                    elif opcode == 7:
+                        mem[lanes, addrs[2]] = values[0] < values[1]
+                    elif opcode == 8:
+                        mem[lanes, addrs[2]] = values[0] == values[1]
+                    elif opcode == 9:
+                        self.relative_bases[lanes] += values[0]
+                    else:
+                        active[lanes] = False
+                        continue
+                    self.ptrs[lanes] += num_params + 1
+
+        for lane in np.flatnonzero(to_scalar).tolist():
+            self._run_scalar(lane, inputs[lane][inputs_used[lane]:])
+        return self.outputs
+
+    def _run_scalar(self, lane: int, inputs: Sequence[int]) -> None:
+        memory = self.memory[lane].tolist()
+        for addr, value in self.big_values[lane].items():
+            memory[addr] = value
+        computer = IntcodeComputer(memory, outputs=self.outputs[lane])
+        computer.ptr = int(self.ptrs[lane])
+        computer.relative_base = int(self.relative_bases[lane])
+        computer.feed(inputs)
+        computer.run()
+        self.scalar_lanes[lane] = computer
+
+
+### Tests ###
+
+# one lane that fits in int64, and one that needs big ints
+overflow_program = [3,100, 1002,100,34915192,100, 1002,100,34915192,100, 4,100, 99]
+batch = BatchIntcode(overflow_program, 2)
+assert batch.run([[1], [34915192]]) == [[34915192 ** 2], [34915192 ** 3]]
+
+# relative mode going past the end of the array
+far_program = [3,20, 109,5000, 21101,3,4,0, 204,0, 4,20, 99]
+batch = BatchIntcode(far_program, 2, extra_memory=10)
+assert batch.run([[1], [2]]) == [[7, 1], [7, 2]]
+assert batch.read(20) == [1, 2]
+
+# the add-then-multiply example, with lanes each multiplying a different value
+noun_program = [1,0,0,3, 2,3,11,0, 99,30,40,50]
+batch = BatchIntcode(noun_program, 3)
+batch.poke(11, [1, 2, 3])
+batch.run()
+assert batch.read(0) == [2, 4, 6]
+
+# values too big for an int64 in the program, poked in or as inputs
+assert BatchIntcode([104, 2 ** 70, 99], 2).run() == [[2 ** 70], [2 ** 70]]
+batch = BatchIntcode([3,5, 4,5, 99, 0], 2)
+assert batch.run([[2 ** 70], [3]]) == [[2 ** 70], [3]]
+batch = BatchIntcode(noun_program, 3)
+batch.poke(11, [1, 2 ** 70, 3])
+assert batch.read(11) == [1, 2 ** 70, 3]
+batch.run()
+assert batch.read(0) == [2, 2 ** 71, 6]
+
+# jumps outside the array are left to the scalar interpreter, which complains as usual
+for jump_program, message in [([1105,1,1000, 99], "Bad instruction"),
+                              ([1105,1,-1, 99], "Negative address")]:
+    try:
+        BatchIntcode(jump_program, 2).run()
+        assert False, "jumping out of the program should be an error"
+    except ValueError as error:
+        assert message in str(error)
@@ -0,0 +1,289 @@
+"""
+Saving a computer's state to disk and restoring it, possibly in another process.
+
+A checkpoint is a fixed-size header followed by int64 arrays: the memory, the outputs, then any
+flat memory words kept in pages past the end of its list (as addresses and values). Values
+too big for an int64 are stored as 0 in the arrays, with the real value in an escape table at the
+end of the file. That goes for addresses and the ptr and relative base in the header too: each
+value's index in the table counts through the memory values, outputs, paged values, memory
+addresses, paged addresses, then the ptr and relative base. Restoring maps the file and converts each array to a list in one go, rather than
+value by value.
+
+Queued inputs and output callbacks aren't saved (they can be anything), and neither are decoded
+instructions or compiled blocks, which are rebuilt as the restored computer runs.
+"""
+from typing import List, NamedTuple, Sequence, Tuple
+from array import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from intcode.computer import IntcodeComputer
+from intcode.memory import DictMemory, FlatMemory
+
+MAGIC = b"ICKP"
+VERSION = 3
+# magic, version, memory kind, flags, ptr, relative base, program hash, number of memory words,
+# number of outputs, number of escaped values, number of paged words. Padded to 64 bytes to keep
+# the arrays aligned.
+HEADER = struct.Struct("<4sHBBqqqQQQQ8x")
+ESCAPE = struct.Struct("<QI")
+
+FLAT, DICT = 0, 1
+HALTED, COMPILED = 1, 2
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _little_endian(words: array) -> bytes:
+    if sys.byteorder == "big":
+        words.byteswap()
+    return words.tobytes()
+
+
+def pack_int64s(values: Sequence[int], offset: int, escapes: List[Tuple[int, int]]) -> bytes:
+    """`values` as int64s, adding any that don't fit to `escapes` (indexed from `offset`)."""
+    try:
+        return _little_endian(array("q", values))
+    except OverflowError:
+        pass
+    words = array("q")
+    for idx, value in enumerate(values):
+        if INT64_MIN <= value <= INT64_MAX:
+            words.append(value)
+        else:
+            words.append(0)
+            escapes.append((offset + idx, value))
+    return _little_endian(words)
+
+
+def pack_escapes(escapes: List[Tuple[int, int]]) -> bytes:
+    """The escape table: each value's index, its length in bytes, then the value."""
+    table = []
+    for idx, value in escapes:
+        value_bytes = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        table.append(ESCAPE.pack(idx, len(value_bytes)) + value_bytes)
+    return b"".join(table)
+
+
+def write_atomically(path: str, chunks: List[bytes]) -> None:
+    """Write to a temporary file and move it into place, so a crash never leaves half a file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(chunks)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class EscapeStarts(NamedTuple):
+    """Where each array's values start in the numbering the escape table uses."""
+    values: int
+    outputs: int
+    paged_values: int
+    addrs: int
+    paged_addrs: int
+    registers: int
+
+
+def _escape_starts(num_words: int, num_outputs: int, num_paged: int,
+                   num_addrs: int) -> EscapeStarts:
+    sizes = [num_words, num_outputs, num_paged, num_addrs, num_paged]
+    return EscapeStarts(*[sum(sizes[:idx]) for idx in range(len(sizes) + 1)])
+
+
+def save_checkpoint(computer: IntcodeComputer, path: str) -> None:
+    memory = computer.memory
+    if isinstance(memory, DictMemory):
+        kind = DICT
+        addrs = sorted(addr for addr, value in memory.words.items() if value)
+        values = [memory.words[addr] for addr in addrs]
+    else:
+        kind = FLAT
+        values = memory.words
+        # the end of flat memory is mostly zero-filled pages, which don't need saving
+        end = len(values)
+        while end and not values[end - 1]:
+            end -= 1
+        values = values[:end]
+        addrs = []
+    paged_addrs: List[int] = []
+    paged_values: List[int] = []
+    if isinstance(memory, FlatMemory):
+        for number, page in sorted(memory.pages.items()):
+            for offset, value in enumerate(page):
+                if value:
+                    paged_addrs.append(number * memory.PAGE_SIZE + offset)
+                    paged_values.append(value)
+    # outputs sent to a callback are gone, so the restored computer starts with an empty list
+    outputs = [] if computer.outputs is None else list(computer.outputs)
+    flags = (HALTED if computer.halted else 0) | (COMPILED if computer.compiled else 0)
+
+    escapes: List[Tuple[int, int]] = []
+    starts = _escape_starts(len(values), len(outputs), len(paged_addrs), len(addrs))
+    body = [pack_int64s(addrs, starts.addrs, escapes),
+            pack_int64s(values, starts.values, escapes),
+            pack_int64s(outputs, starts.outputs, escapes),
+            pack_int64s(paged_addrs, starts.paged_addrs, escapes),
+            pack_int64s(paged_values, starts.paged_values, escapes)]
+    registers = [computer.ptr, computer.relative_base]
+    for idx, value in enumerate(registers):
+        if not INT64_MIN <= value <= INT64_MAX:
+            escapes.append((starts.registers + idx, value))
+            registers[idx] = 0
+    body.append(pack_escapes(escapes))
+    header = HEADER.pack(MAGIC, VERSION, kind, flags, *registers, computer._program_hash,
+                         len(values), len(outputs), len(escapes), len(paged_addrs))
+
+    write_atomically(path, [header] + body)
+
+
+def _check_length(view: memoryview, end: int) -> None:
+    if len(view) < end:
+        raise ValueError(f"Truncated file: {len(view)} bytes, expected at least {end}.")
+
+
+def unpack_escapes(view: memoryview, offset: int, num_escapes: int) -> List[Tuple[int, int]]:
+    escapes = []
+    for _ in range(num_escapes):
+        _check_length(view, offset + ESCAPE.size)
+        idx, length = ESCAPE.unpack_from(view, offset)
+        offset += ESCAPE.size
+        _check_length(view, offset + length)
+        escapes.append((idx, int.from_bytes(view[offset:offset + length], "little", signed=True)))
+        offset += length
+    return escapes
+
+
+def unpack_int64s(view: memoryview, start: int, count: int) -> List[int]:
+    _check_length(view, start + 8 * count)
+    values = view[start:start + 8 * count].cast("q")
+    try:
+        if sys.byteorder == "big":
+            words = array("q", values)
+            words.byteswap()
+            return words.tolist()
+        return values.tolist()
+    finally:
+        values.release()
+
+
+def load_checkpoint(path: str) -> IntcodeComputer:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+            memoryview(mapped) as view:
+        _check_length(view, HEADER.size)
+        (magic, version, kind, flags, *registers, program_hash, num_words, num_outputs,
+         num_escapes, num_paged) = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} isn't a version {VERSION} Intcode checkpoint.")
+        offset = HEADER.size
+        addrs = []
+        if kind == DICT:
+            addrs = unpack_int64s(view, offset, num_words)
+            offset += 8 * num_words
+        values = unpack_int64s(view, offset, num_words)
+        offset += 8 * num_words
+        outputs = unpack_int64s(view, offset, num_outputs)
+        offset += 8 * num_outputs
+        paged_addrs = unpack_int64s(view, offset, num_paged)
+        offset += 8 * num_paged
+        paged_values = unpack_int64s(view, offset, num_paged)
+        offset += 8 * num_paged
+        starts = _escape_starts(num_words, num_outputs, num_paged, len(addrs))
+        # in the same order as the escape numbering
+        arrays = [values, outputs, paged_values, addrs, paged_addrs, registers]
+        for idx, value in unpack_escapes(view, offset, num_escapes):
+            number = bisect.bisect_right(starts, idx) - 1
+            if number < 0 or idx - starts[number] >= len(arrays[number]):
+                raise ValueError(f"{path} has an escaped value out of range.")
+            arrays[number][idx - starts[number]] = value
+        ptr, relative_base = registers
+
+    if kind == DICT:
+        memory = DictMemory([])
+        memory.words.update(zip(addrs, values))
+    else:
+        memory = FlatMemory([])
+        memory.words = values
+        for addr, value in zip(paged_addrs, paged_values):
+            memory[addr] = value
+    computer = IntcodeComputer([], type(memory), bool(flags & COMPILED), outputs)
+    computer.memory = memory
+    computer.program = memory.words
+    computer.ptr = ptr
+    computer.relative_base = relative_base
+    computer.halted = bool(flags & HALTED)
+    computer._program_hash = program_hash
+    return computer
+
+
+### Tests ###
+
+with tempfile.TemporaryDirectory() as checkpoint_dir:
+    checkpoint_path = os.path.join(checkpoint_dir, "computer.ckpt")
+
+    # stop halfway through, waiting for input, and carry on from the checkpoint
+    doubler = [3,11, 1002,11,2,11, 4,11, 1105,1,0, 0]
+    for memory_type in [FlatMemory, DictMemory]:
+        for compiled in [False, True]:
+            computer = IntcodeComputer(doubler, memory_type, compiled)
+            computer.feed([1, 2 ** 70])
+            assert not computer.run()
+            save_checkpoint(computer, checkpoint_path)
+            restored = load_checkpoint(checkpoint_path)
+            assert type(restored.memory) is memory_type and restored.compiled == compiled
+            assert restored.outputs == [2, 2 ** 71] and not restored.halted
+            assert restored.memory[11] == 2 ** 71
+            restored.feed([3])
+            assert not restored.run() and restored.outputs == [2, 2 ** 71, 6]
+
+    # relative mode memory far past the program, and a halted computer
+    far_computer = IntcodeComputer([109,5000,21101,3,4,0,204,0,204,1,99])
+    assert far_computer.run()
+    save_checkpoint(far_computer, checkpoint_path)
+    restored = load_checkpoint(checkpoint_path)
+    assert restored.halted and restored.outputs == [7, 0] and restored.memory[5000] == 7
+    # the zero-filled pages at the end aren't saved
+    assert os.path.getsize(checkpoint_path) == HEADER.size + 8 * (5001 + 2)
+
+    # words far past the end of flat memory are saved from its pages
+    paged_computer = IntcodeComputer([109,10**10,21101,2**70,1,0,204,0,99])
+    assert paged_computer.run() and paged_computer.outputs == [2 ** 70 + 1]
+    save_checkpoint(paged_computer, checkpoint_path)
+    restored = load_checkpoint(checkpoint_path)
+    assert restored.memory[10 ** 10] == 2 ** 70 + 1 and len(restored.memory.words) < 10 ** 4
+
+    # a checkpoint cut short, at a word boundary or not, is an error rather than a short memory
+    with open(checkpoint_path, "rb") as f:
+        checkpoint_bytes = f.read()
+    for cut in [HEADER.size // 2, HEADER.size + 8, len(checkpoint_bytes) - 3]:
+        with open(checkpoint_path, "wb") as f:
+            f.write(checkpoint_bytes[:cut])
+        try:
+            load_checkpoint(checkpoint_path)
+            assert False, "a truncated checkpoint should be an error"
+        except ValueError:
+            pass
+
+    # paged addresses, dict addresses, the ptr and the relative base can all be too big for an int64
+    big_address = IntcodeComputer([1101,3,4,2**64, 3,0, 4,2**64, 99])
+    assert not big_address.run()
+    save_checkpoint(big_address, checkpoint_path)
+    restored = load_checkpoint(checkpoint_path)
+    assert restored.memory[0] == 1101 and restored.memory[2 ** 64] == 7
+    restored.feed([5])
+    assert restored.run() and restored.outputs == [7]
+    dict_computer = IntcodeComputer([1101,3,4,2**64, 99], DictMemory)
+    assert dict_computer.run()
+    save_checkpoint(dict_computer, checkpoint_path)
+    assert load_checkpoint(checkpoint_path).memory[2 ** 64] == 7
+    big_registers = IntcodeComputer([109,2**64, 3,0, 204,0, 99])
+    assert not big_registers.run()
+    big_registers.ptr += 2 ** 70
+    save_checkpoint(big_registers, checkpoint_path)
+    restored = load_checkpoint(checkpoint_path)
+    assert restored.relative_base == 2 ** 64 and restored.ptr == 2 + 2 ** 70
@@ -0,0 +1,78 @@
+from typing import Callable, Dict, List, Set, Tuple
+from intcode.instructions import Instruction
+from intcode.memory import Memory, Program
+
+# Blocks stop before these, which the interpreter runs (they can block, emit or halt)
+UNCOMPILED_OPCODES = {3, 4, 99}
+# ...and after these
+JUMP_OPCODES = {5, 6}
+MAX_BLOCK_LENGTH = 64
+
+Block = Callable[[Program, int, Set[int], Callable[[int], bool]], Tuple[int, int, bool]]
+
+# (program hash, block start) -> the block's words when compiled -> (compiled block, highest
+# static address it uses). Programs that keep data in their code (e.g. an input stored in an
+# operand) compile a block for each value they see, so we keep the most recent few.
+BLOCK_CACHE: Dict[Tuple[int, int], Dict[Tuple[int, ...], Tuple[Block, int]]] = {}
+MAX_BLOCK_VARIANTS = 16
+NOT_COMPILED = object()
+
+
+def block_source(program: Memory, instructions: List[Tuple[int, Instruction]]) -> str:
+    """
+    Python source for a straight-line run of instructions. The generated function takes the memory,
+    relative base, the computer's write barrier and the memory's `reserve`, and returns the next
+    address, the new relative base, and whether the interpreter must run the instruction at that
+    address. That happens when a write hits the write barrier (e.g. it would land on code): we stop
+    just before it, and the interpreter does the write and whatever else it needs.
+    """
+    lines = ["def block(mem, rb, code, reserve):"]
+    for ptr, instruction in instructions:
+        values = []
+        for mode, operand in zip(instruction.modes, instruction.operands):
+            if mode == 0:
+                values.append(f"mem[{operand}]")
+            elif mode == 1:
+                values.append(repr(program[operand]))
+            else:
+                values.append(f"mem[rb + {operand}]")
+        if instruction.relative:
+            offsets = [operand for mode, operand in zip(instruction.modes, instruction.operands)
+                       if mode == 2]
+            # the interpreter deals with addresses that are negative or can't be indexed directly
+            lines.append(f"    if rb + {min(offsets)} < 0 or "
+                         f"(rb + {max(offsets)} >= len(mem) and not reserve(rb + {max(offsets)})): "
+                         f"return {ptr}, rb, True")
+
+        opcode = instruction.opcode
+        if opcode in (1, 2, 7, 8):
+            a, b = values[:2]
+            dest = instruction.operands[2]
+            result = {1: f"{a} + {b}",
+                      2: f"{a} * {b}",
+                      7: f"1 if {a} < {b} else 0",
+                      8: f"1 if {a} == {b} else 0"}[opcode]
+            lines.append(f"    dest = {'rb + ' if instruction.modes[2] == 2 else ''}{dest}")
+            lines.append(f"    if dest in code: return {ptr}, rb, True")
+            lines.append(f"    mem[dest] = {result}")
+        elif opcode == 5:
+            lines.append(f"    if {values[0]}: return {values[1]}, rb, False")
+        elif opcode == 6:
+            lines.append(f"    if not {values[0]}: return {values[1]}, rb, False")
+        elif opcode == 9:
+            lines.append(f"    rb += {values[0]}")
+        else:
+            raise ValueError(f"Can't compile opcode {opcode} at address {ptr}.")
+
+    last_ptr, last_instruction = instructions[-1]
+    lines.append(f"    return {last_ptr + last_instruction.length}, rb, False")
+    return "\n".join(lines)
+
+
+def compile_block(program: Memory, instructions: List[Tuple[int, Instruction]]) -> Block:
+    start = instructions[0][0]
+    namespace: Dict[str, Block] = {}
+    exec(compile(block_source(program, instructions), f"<intcode block {start}>", "exec"),
+         namespace)
+    return namespace["block"]
+
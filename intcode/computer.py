@@ -0,0 +1,565 @@
+from typing import Callable, DefaultDict, Deque, Dict, Iterable, Iterator, List, NamedTuple, \
+    Optional, Sequence, Set, Tuple, Type, Union
+from collections import defaultdict, deque
+import itertools as it
+import os
+import time
+from intcode.compiler import BLOCK_CACHE, JUMP_OPCODES, MAX_BLOCK_LENGTH, MAX_BLOCK_VARIANTS, \
+    NOT_COMPILED, UNCOMPILED_OPCODES, Block, compile_block
+from intcode.instructions import MAX_INSTRUCTION_LENGTH, Instruction, decode, paged
+from intcode import optimizer
+from intcode.memory import EVERY_ADDRESS, DictMemory, EveryAddress, FlatMemory, Memory, Program
+from intcode.profiling import Profile
+
+
+class Snapshot(NamedTuple):
+    # shared with the computer it was taken from, which copies it before its next write
+    memory: Memory
+    ptr: int
+    relative_base: int
+    outputs: Tuple[int, ...]
+    halted: bool
+    compiled: bool
+    program_hash: int
+
+
+# Where outputs go: anything we can append to (e.g. a list, or a bounded deque to only keep the
+# latest few), or a callback
+OutputSink = Union[List[int], Deque[int], Callable[[int], None]]
+
+
+class IntcodeComputer:
+    def __init__(self, program: List[int], memory: Type[Memory] = FlatMemory,
+                 compiled: bool = False, outputs: Optional[OutputSink] = None,
+                 optimize: bool = False):
+        self.memory = memory(program)
+        # The memory's underlying container; we index it directly since this is the hot path.
+        self.program: Program = self.memory.words
+        self.set_outputs([] if outputs is None else outputs)
+        self.ptr = 0
+        self.relative_base = 0
+        self.halted = False
+        # Inputs are a queue of iterables (which can be generators), used up in order.
+        self.inputs: Deque[Iterator[int]] = deque()
+        self.waiting_for_input = False
+        # Outputs still to go before we stop: negative means no limit.
+        self.outputs_left = -1
+        # Instructions are decoded once and cached by address. Writes to any address covered by a
+        # cached instruction drop it from the cache, so self-modifying programs still work.
+        self._decoded: Dict[int, Instruction] = {}
+        self._code_addresses: Set[int] = set()
+        # Writes to these addresses need extra work. Usually that's the code addresses, but while
+        # the memory is shared with a snapshot it's every address.
+        self._write_barrier: Union[Set[int], EveryAddress] = self._code_addresses
+        # In compiled mode, straight-line runs of instructions are compiled to Python functions.
+        # Compiled blocks are shared between computers running the same program. A block that's
+        # written to is dropped, and from then on its start address is left to the interpreter.
+        self.compiled = compiled
+        self._program_hash = hash(tuple(program)) if compiled else 0
+        self._blocks: Dict[int, Optional[Block]] = {}
+        self._block_starts: DefaultDict[int, Set[int]] = defaultdict(set)
+        # The optimizer's rewritten instructions (folded constants and fused compare-and-jumps)
+        # are used in place of decoding, as long as memory still holds the words they were made
+        # from (it can be written to before the program runs). They go into the decode cache, so
+        # they're dropped like any other instruction if they're written to.
+        self._rewrites = optimizer.cached_optimize(program) if optimize else {}
+        # Profiling swaps in an instrumented run loop, so it costs nothing when it's not on.
+        self.profile: Optional[Profile] = None
+        self._run_loop: Callable[[], bool] = (self._run_compiled if compiled
+                                              else self._run_interpreted)
+
+    def set_outputs(self, outputs: OutputSink) -> None:
+        if callable(outputs):
+            self.outputs: Optional[Union[List[int], Deque[int]]] = None
+            self.emit: Callable[[int], None] = outputs
+        else:
+            self.outputs = outputs
+            self.emit = outputs.append
+
+    def feed(self, values: Iterable[int]) -> None:
+        """Queue up inputs. They're only taken from `values` as the program asks for them."""
+        self.inputs.append(iter(values))
+
+    def next_input(self) -> Optional[int]:
+        while self.inputs:
+            value = next(self.inputs[0], None)
+            if value is not None:
+                return value
+            self.inputs.popleft()
+        return None
+
+    def write(self, addr: int, value: int) -> None:
+        if addr in self._write_barrier:
+            if self._write_barrier is EVERY_ADDRESS:
+                self._unshare_memory()
+            if addr in self._code_addresses:
+                self._invalidate(addr)
+        self.program[addr] = value
+
+    def _unshare_memory(self) -> None:
+        indexing_memory = self.program is self.memory
+        self.memory = self.memory.copy()
+        self.program = self.memory if indexing_memory else self.memory.words
+        self._write_barrier = self._code_addresses
+
+    def run_paged(self, handler: Callable[..., Optional[int]], ptr: int,
+                  addrs: Sequence[int]) -> Optional[int]:
+        """
+        Run an instruction whose addresses can't all be indexed in the memory's list directly
+        (they're negative, or too far past the end), through the memory object instead.
+        """
+        for addr in addrs:
+            # negative addresses are an error, as they are when static addresses are decoded
+            self.memory.reserve(addr)
+        self.program = self.memory
+        try:
+            return handler(self, ptr, *addrs)
+        finally:
+            self.program = self.memory.words
+
+    def snapshot(self) -> Snapshot:
+        """
+        Capture the computer's state. The memory isn't copied: this computer (and any restored from
+        the snapshot) copy it when they next write to it.
+        """
+        self._write_barrier = EVERY_ADDRESS
+        outputs = () if self.outputs is None else tuple(self.outputs)
+        return Snapshot(self.memory, self.ptr, self.relative_base, outputs, self.halted,
+                        self.compiled, self._program_hash)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "IntcodeComputer":
+        computer = cls([], type(snapshot.memory), snapshot.compiled)
+        computer.memory = snapshot.memory
+        computer.program = snapshot.memory.words
+        computer._write_barrier = EVERY_ADDRESS
+        computer.set_outputs(list(snapshot.outputs))
+        computer.ptr = snapshot.ptr
+        computer.relative_base = snapshot.relative_base
+        computer.halted = snapshot.halted
+        computer._program_hash = snapshot.program_hash
+        return computer
+
+    def fork(self) -> "IntcodeComputer":
+        """
+        A copy of this computer, which can be run independently from where this one stopped. It
+        starts with a list of this computer's outputs so far, and no queued inputs.
+        """
+        child = IntcodeComputer.from_snapshot(self.snapshot())
+        # the memory is the same, so the decoded instructions and compiled blocks are still good
+        child._decoded = self._decoded.copy()
+        child._rewrites = self._rewrites
+        child._code_addresses = set(self._code_addresses)
+        child._blocks = self._blocks.copy()
+        child._block_starts = defaultdict(set, {addr: set(starts)
+                                                for addr, starts in self._block_starts.items()})
+        return child
+
+    def _decode(self, ptr: int) -> Instruction:
+        rewrite = self._rewrites.get(ptr)
+        if rewrite is not None and all(self.memory[addr] == word
+                                       for addr, word in enumerate(rewrite[0], ptr)):
+            instruction = rewrite[1]
+            # as when decoding, static addresses need to exist before we can index them
+            for mode, operand in zip(instruction.modes, instruction.operands):
+                if mode != 2:
+                    self.memory.reserve(operand)
+        else:
+            instruction = decode(self.memory, ptr)
+        self._decoded[ptr] = instruction
+        self._code_addresses.update(range(ptr, ptr + instruction.length))
+        return instruction
+
+    def _invalidate(self, addr: int) -> None:
+        # only instructions starting at these can cover `addr`
+        for start in range(addr - MAX_INSTRUCTION_LENGTH + 1, addr + 1):
+            instruction = self._decoded.get(start)
+            if instruction is not None and start + instruction.length > addr:
+                del self._decoded[start]
+        for start in self._block_starts.pop(addr, ()):
+            self._blocks[start] = None
+
+    def _compile_block(self, ptr: int) -> Optional[Block]:
+        block = self._cached_block(ptr)
+        if block is not None:
+            return block
+        instructions = []
+        next_ptr = ptr
+        while len(instructions) < MAX_BLOCK_LENGTH:
+            try:
+                instruction = decode(self.memory, next_ptr)
+            except ValueError:
+                # leave it to the interpreter to complain, if we ever get there
+                break
+            if instruction.opcode in UNCOMPILED_OPCODES or paged(instruction):
+                break
+            instructions.append((next_ptr, instruction))
+            next_ptr += instruction.length
+            if instruction.opcode in JUMP_OPCODES:
+                break
+        if not instructions:
+            self._blocks[ptr] = None
+            return None
+
+        words = tuple(self.memory[addr] for addr in range(ptr, next_ptr))
+        top = max((operand for _, instruction in instructions
+                   for mode, operand in zip(instruction.modes, instruction.operands) if mode != 2),
+                  default=ptr)
+        block = compile_block(self.memory, instructions)
+        variants = BLOCK_CACHE.setdefault((self._program_hash, ptr), {})
+        if len(variants) >= MAX_BLOCK_VARIANTS:
+            del variants[next(iter(variants))]
+        variants[words] = (block, top)
+        self._add_block(ptr, next_ptr, block)
+        return block
+
+    def _cached_block(self, ptr: int) -> Optional[Block]:
+        """
+        A block another computer running the same program compiled at `ptr`, if the memory there
+        still holds the same words. This saves decoding the instructions again.
+        """
+        for words, (block, top) in BLOCK_CACHE.get((self._program_hash, ptr), {}).items():
+            end = ptr + len(words)
+            if all(self.memory[addr] == word for addr, word in zip(range(ptr, end), words)):
+                # as when decoding, static addresses need to exist before the block indexes them
+                self.memory.reserve(top)
+                self._add_block(ptr, end, block)
+                return block
+        return None
+
+    def _add_block(self, ptr: int, end: int, block: Block) -> None:
+        self._blocks[ptr] = block
+        for addr in range(ptr, end):
+            self._block_starts[addr].add(ptr)
+        self._code_addresses.update(range(ptr, end))
+
+    def _step(self, ptr: int) -> Optional[int]:
+        """Interpret the single instruction at `ptr`, returning the next address as handlers do."""
+        instruction = self._decoded.get(ptr)
+        if instruction is None:
+            instruction = self._decode(ptr)
+        if instruction.relative:
+            rel_base = self.relative_base
+            addrs = [operand + rel_base if mode == 2 else operand
+                     for mode, operand in zip(instruction.modes, instruction.operands)]
+            if self.memory.reserve(max(addrs)) and min(addrs) >= 0:
+                return instruction.handler(self, ptr, *addrs)
+            return self.run_paged(instruction.handler, ptr, addrs)
+        return instruction.handler(self, ptr, *instruction.operands)
+
+    def run(self, inp: Optional[int] = None) -> bool:
+        """
+        We queue `inp` (if given) and run until we
+        a) need an input we don't have (return False), or
+        b) halt (return True)
+        """
+        if inp is not None:
+            self.feed((inp,))
+        self.waiting_for_input = False
+        return self._run_loop()
+
+    def enable_profiling(self) -> Profile:
+        """
+        Start recording a profile of what the computer does. This always uses the interpreter, even
+        in compiled mode, since we count every instruction. The optimizer's rewrites are dropped
+        too, so that each instruction is counted as itself.
+        """
+        self._decoded.clear()
+        self._rewrites = {}
+        self.profile = Profile()
+        self._run_loop = self._run_profiled
+        return self.profile
+
+    def run_until(self, n_outputs: int) -> bool:
+        """Like `run`, but also stops (returning False) once we've produced `n_outputs` outputs."""
+        if n_outputs <= 0:
+            # nothing to run: the handlers only stop when the count gets down to 0
+            return self.halted
+        self.outputs_left = n_outputs
+        try:
+            return self.run()
+        finally:
+            self.outputs_left = -1
+
+    def iter_outputs(self) -> Iterator[int]:
+        """Run the computer, yielding outputs as they're produced, until it halts or needs input."""
+        while not self.halted:
+            outputs: List[int] = []
+            emit = self.emit
+            self.emit = outputs.append
+            try:
+                self.run_until(1)
+            finally:
+                self.emit = emit
+            yield from outputs
+            if self.waiting_for_input:
+                return
+
+    def _run_interpreted(self) -> bool:
+        decoded = self._decoded
+        ptr = self.ptr
+        while True:
+            instruction = decoded.get(ptr)
+            if instruction is None:
+                instruction = self._decode(ptr)
+            if instruction.relative:
+                rel_base = self.relative_base
+                addrs = [operand + rel_base if mode == 2 else operand
+                         for mode, operand in zip(instruction.modes, instruction.operands)]
+                # static addresses were reserved when decoding, but these can go anywhere
+                if self.memory.reserve(max(addrs)) and min(addrs) >= 0:
+                    next_ptr = instruction.handler(self, ptr, *addrs)
+                else:
+                    next_ptr = self.run_paged(instruction.handler, ptr, addrs)
+            else:
+                next_ptr = instruction.handler(self, ptr, *instruction.operands)
+            if next_ptr is None:
+                return self.halted
+            ptr = next_ptr
+
+    def _run_compiled(self) -> bool:
+        blocks = self._blocks
+        ptr = self.ptr
+        while True:
+            block = blocks.get(ptr, NOT_COMPILED)
+            if block is NOT_COMPILED:
+                block = self._compile_block(ptr)
+            if block is not None:
+                # the memory and write barrier change if the memory is unshared, so no caching them
+                ptr, self.relative_base, interpret_next = block(
+                    self.program, self.relative_base, self._write_barrier, self.memory.reserve)
+                if not interpret_next:
+                    continue
+            next_ptr = self._step(ptr)
+            if next_ptr is None:
+                return self.halted
+            ptr = next_ptr
+
+    def _run_profiled(self) -> bool:
+        # the same as _run_interpreted, with added bookkeeping
+        profile = self.profile
+        start = time.perf_counter()
+        decoded = self._decoded
+        ptr = self.ptr
+        try:
+            while True:
+                instruction = decoded.get(ptr)
+                if instruction is None:
+                    instruction = self._decode(ptr)
+                profile.opcode_counts[instruction.opcode] += 1
+                profile.address_counts[ptr] += 1
+                if instruction.relative:
+                    rel_base = self.relative_base
+                    addrs = [operand + rel_base if mode == 2 else operand
+                             for mode, operand in zip(instruction.modes, instruction.operands)]
+                    top = max(addr for mode, addr in zip(instruction.modes, addrs) if mode == 2)
+                    if profile.max_relative_address is None or top > profile.max_relative_address:
+                        profile.max_relative_address = top
+                    if self.memory.reserve(max(addrs)) and min(addrs) >= 0:
+                        next_ptr = instruction.handler(self, ptr, *addrs)
+                    else:
+                        next_ptr = self.run_paged(instruction.handler, ptr, addrs)
+                else:
+                    next_ptr = instruction.handler(self, ptr, *instruction.operands)
+                if next_ptr is None:
+                    if self.waiting_for_input:
+                        profile.input_waits += 1
+                    return self.halted
+                ptr = next_ptr
+        finally:
+            profile.run_seconds.append(time.perf_counter() - start)
+
+
+
+# The ways of running a program, as `IntcodeComputer` options. The interpreter is quickest for short
+# runs (like day 7's amplifiers, each only a few dozen instructions) and for self-modifying
+# programs. Compiling blocks pays off for long-running programs: day 9 runs several times faster.
+# The optimizer saves around 10% on loops of compares and jumps that write to data (days 9 and
+# 11), but on short runs looking up its rewrites costs more than they save.
+BACKENDS: Dict[str, Dict[str, object]] = {
+    "interpreted": {},
+    "compiled": {"compiled": True},
+    "dict": {"memory": DictMemory},
+    "optimized": {"optimize": True},
+}
+
+
+def preferred_backend(backend: str) -> str:
+    """
+    The backend a puzzle asks for, unless INTCODE_BACKEND is set: that runs every puzzle with
+    the one backend (the puzzles build their computers from `BACKENDS` with this, or with
+    `DEFAULT_BACKEND`).
+    """
+    return os.environ.get("INTCODE_BACKEND") or backend
+
+
+DEFAULT_BACKEND = preferred_backend("interpreted")
+
+
+def run_intcode(program: List[int], inputs: Iterable[int] = (),
+                backend: Optional[str] = None) -> List[int]:
+    """Run `program` with `inputs` until it halts or runs out of input, returning its outputs."""
+    computer = IntcodeComputer(program, **BACKENDS[backend or DEFAULT_BACKEND])
+    computer.feed(inputs)
+    computer.run()
+    return computer.outputs
+
+
+### Tests ###
+
+# self-modifying code: the add at address 0 is run once, rewritten into a multiply, and run again
+computer0 = IntcodeComputer([1,19,20,21, 1005,22,18, 1101,1,1,0, 1101,1,0,22, 1105,1,0, 99, 6,7,0,0])
+computer0.run()
+assert computer0.program[21] == 42
+computer0 = IntcodeComputer([1,19,20,21, 1005,22,18, 1101,1,1,0, 1101,1,0,22, 1105,1,0, 99, 6,7,0,0],
+                            compiled=True)
+computer0.run()
+assert computer0.program[21] == 42
+
+
+# forks share memory until one of them writes to it
+for compiled in [False, True]:
+    parent = IntcodeComputer([3,9, 1001,9,1,9, 4,9, 99, 0], compiled=compiled)
+    parent.run()
+    child = parent.fork()
+    booted = parent.snapshot()
+    parent.run(10)
+    child.run(20)
+    assert parent.outputs == [11] and child.outputs == [21]
+    restored = IntcodeComputer.from_snapshot(booted)
+    assert restored.run(5)
+    assert restored.outputs == [6] and restored.memory[9] == 6 and booted.memory[9] == 0
+
+
+# streaming inputs from a generator, into a bounded deque and a callback
+doubler = [3,11, 1002,11,2,11, 4,11, 1105,1,0, 0]
+latest: Deque[int] = deque(maxlen=2)
+computer1 = IntcodeComputer(doubler, outputs=latest)
+computer1.feed(range(1, 6))
+assert not computer1.run() and computer1.waiting_for_input
+assert list(latest) == [8, 10]
+collected: List[int] = []
+computer1 = IntcodeComputer(doubler, compiled=True, outputs=collected.append)
+computer1.feed(range(1, 5))
+assert not computer1.run_until(3)
+assert collected == [2, 4, 6] and not computer1.waiting_for_input
+computer1.feed([100])
+assert list(computer1.iter_outputs()) == [8, 200]
+
+
+def thruster_signal(program: List[int], phase_setting: Sequence[int]) -> int:
+    # first time an amp asks for input, give it the phase signal. After that, it's all signals
+    # from previous amps. Halt when the last amp halts.
+    amps = [IntcodeComputer(program) for _ in range(5)]
+    for amp_idx in range(5):
+        amps[amp_idx].run(phase_setting[amp_idx])
+
+    # hacky, but we prime last amp with 0 so first amp will use 0 as input
+    amps[4].outputs.append(0)
+    for amp_idx in it.cycle(range(5)):
+        prev_amp = amps[(amp_idx - 1) % 5]
+        amp_halted = amps[amp_idx].run(prev_amp.outputs[-1])
+        if amp_halted and amp_idx == 4:
+            return amps[amp_idx].outputs[-1]
+
+
+def max_thruster_signal(program: List[int]) -> int:
+    return max(thruster_signal(program, phase_setting)
+               for phase_setting in it.permutations(range(5, 10)))
+
+
+program1 = [3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5]
+phase_setting1 = [9,8,7,6,5]
+program2 = [3,52,1001,52,-5,52,3,53,1,52,56,54,1007,54,5,55,1005,55,26,1001,54,-5,54,1105,1,12,1,53,
+            54,53,1008,54,0,55,1001,55,1,55,2,53,55,53,4,53,1001,56,-1,56,1005,56,6,99,0,0,0,0,10]
+phase_setting2 = [9,7,8,5,6]
+
+assert thruster_signal(program1, phase_setting1) == 139629729
+assert max_thruster_signal(program1) == 139629729
+assert thruster_signal(program2, phase_setting2) == 18216
+assert max_thruster_signal(program2) == 18216
+
+program3 = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+computer3 = IntcodeComputer(program3)
+computer3.run()
+assert computer3.outputs == program3
+
+computer4 = IntcodeComputer([1102,34915192,34915192,7,4,7,99,0])
+computer4.run()
+assert len(str(computer4.outputs[-1])) == 16
+
+program5 = [104,1125899906842624,99]
+computer5 = IntcodeComputer(program5)
+computer5.run()
+assert computer5.outputs[-1] == program5[1]
+
+# relative mode reaching far past the end of the program, in both memory backends
+far_program = [109,5000,21101,3,4,0,204,0,204,1,99]
+for memory in [FlatMemory, DictMemory]:
+    far_computer = IntcodeComputer(far_program, memory)
+    far_computer.run()
+    assert far_computer.outputs == [7, 0]
+    assert far_computer.memory[5000] == 7
+    assert far_computer.memory[10 ** 6] == 0
+
+profiled_computer = IntcodeComputer(far_program, compiled=True)
+profile = profiled_computer.enable_profiling()
+assert profiled_computer.run()
+report = profile.report()
+assert report["instructions"] == 5
+assert report["opcode_counts"] == {"1": 1, "4": 2, "9": 1, "99": 1}
+assert report["max_relative_address"] == 5001
+assert report["input_waits"] == 0 and len(report["run_seconds"]) == 1
+
+for backend in BACKENDS:
+    assert run_intcode([3,9,8,9,10,9,4,9,99,-1,8], [8], backend) == [1]
+    assert run_intcode([3,9,8,9,10,9,4,9,99,-1,8], [7], backend) == [0]
+
+# the optimizer's rewrites run the same as the original instructions, including when the program
+# writes over them: here a fused compare sets the condition of its own jump
+countdown = [1101,0,5,20, 4,20, 1001,20,-1,20, 1008,20,0,21, 1006,21,4, 99, 0,0,0,0]
+assert run_intcode(countdown, backend="optimized") == [5, 4, 3, 2, 1]
+rewrite_jump = [109,11, 21007,15,1,-4, 1105,0,12, 104,7,99, 104,8,99, 0]
+assert run_intcode(rewrite_jump, backend="optimized") == run_intcode(rewrite_jump) == [8]
+optimized_computer = IntcodeComputer(far_program, optimize=True)
+optimized_computer.enable_profiling()
+optimized_computer.run()
+assert optimized_computer.profile.report()["opcode_counts"] == {"1": 1, "4": 2, "9": 1, "99": 1}
+
+# addresses far past the program are kept in pages: reading them doesn't use any memory, and
+# negative addresses are an error rather than wrapping around to the end of memory
+for backend in BACKENDS:
+    assert run_intcode([4,10**10,99], backend=backend) == [0]
+    assert run_intcode([109,10**10,204,0,99], backend=backend) == [0]
+    far_write = [1101,3,4,10**10, 1001,10**10,1,10**10, 4,10**10, 99]
+    assert run_intcode(far_write, backend=backend) == [8]
+    assert run_intcode([109,10**10, 21101,3,4,1, 22101,1,1,0, 204,0, 99], backend=backend) == [8]
+    for negative in [[21101,7,8,-3, 4,0, 99], [1101,7,8,-3, 4,0, 99], [4,-1, 99]]:
+        try:
+            run_intcode(negative, backend=backend)
+            assert False, "negative addresses should be an error"
+        except ValueError:
+            pass
+
+# an input stored in an operand: each value gets its own compiled block, which later computers
+# running the program with that value reuse
+stores_in_operand = [3,4, 1101,0,0,10, 4,10, 99, 0,0]
+for value in [1, 2, 1]:
+    assert run_intcode(stores_in_operand, [value], "compiled") == [value]
+assert len(BLOCK_CACHE[(hash(tuple(stores_in_operand)), 2)]) == 2
+
+# a rewrite made from the program as loaded isn't used once memory is written to before running:
+# here the add of two immediates was folded to a store of 0
+for poke in [False, True]:
+    poked_computer = IntcodeComputer([1101,0,0,5, 99, 0], optimize=True)
+    if poke:
+        poked_computer.memory[1] = 2
+        poked_computer.memory[2] = 3
+    assert poked_computer.run() and poked_computer.memory[5] == (5 if poke else 0)
+    assert (poked_computer._decoded[0] is poked_computer._rewrites[0][1]) == (not poke)
+# asking for no outputs runs nothing
+for compiled in [False, True]:
+    two_outputs = IntcodeComputer([104,1, 104,2, 99], compiled=compiled)
+    assert not two_outputs.run_until(0) and two_outputs.outputs == []
+    assert not two_outputs.run_until(1) and two_outputs.outputs == [1]
+    assert two_outputs.run() and two_outputs.outputs == [1, 2]
@@ -0,0 +1,158 @@
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+from functools import partial
+from intcode.memory import Memory
+
+if TYPE_CHECKING:
+    from intcode.computer import IntcodeComputer
+
+
+def parse_instruction(instruction_num: int) -> List[int]:
+    opcode = instruction_num % 100
+    instruction_num = (instruction_num - opcode) // 100
+    instruction_parts = [opcode]
+    for _ in range(3):
+        instruction_parts.append(instruction_num % 10)
+        instruction_num = (instruction_num - instruction_parts[-1]) // 10
+    return instruction_parts
+
+
+class Instruction(NamedTuple):
+    opcode: int
+    handler: Callable[..., Optional[int]]
+    modes: Tuple[int, ...]
+    # Position and immediate mode operands are stored as the address they refer to. Relative mode
+    # operands are stored as their offset, and have the relative base added when executed.
+    operands: Tuple[int, ...]
+    relative: bool
+    # number of words it takes up
+    length: int
+
+
+# The longest an instruction can be, counting the optimizer's superinstructions
+MAX_INSTRUCTION_LENGTH = 7
+
+
+# Each handler takes the computer, the instruction's address and the operand addresses, and returns
+# the address of the next instruction. If the computer needs to stop (waiting for input, enough
+# outputs or halted), it sets `computer.ptr` to where to carry on from and returns None instead.
+
+def _add(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int) -> int:
+    computer.write(dest, computer.program[a] + computer.program[b])
+    return ptr + 4
+
+
+def _multiply(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int) -> int:
+    computer.write(dest, computer.program[a] * computer.program[b])
+    return ptr + 4
+
+
+def _input(computer: "IntcodeComputer", ptr: int, dest: int) -> Optional[int]:
+    value = computer.next_input()
+    if value is None:
+        computer.waiting_for_input = True
+        computer.ptr = ptr
+        return None
+    computer.write(dest, value)
+    return ptr + 2
+
+
+def _output(computer: "IntcodeComputer", ptr: int, a: int) -> Optional[int]:
+    computer.emit(computer.program[a])
+    computer.outputs_left -= 1
+    if computer.outputs_left == 0:
+        computer.ptr = ptr + 2
+        return None
+    return ptr + 2
+
+
+def _jump_if_true(computer: "IntcodeComputer", ptr: int, a: int, target: int) -> int:
+    return computer.program[target] if computer.program[a] else ptr + 3
+
+
+def _jump_if_false(computer: "IntcodeComputer", ptr: int, a: int, target: int) -> int:
+    return ptr + 3 if computer.program[a] else computer.program[target]
+
+
+def _less_than(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int) -> int:
+    computer.write(dest, 1 if computer.program[a] < computer.program[b] else 0)
+    return ptr + 4
+
+
+def _equals(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int) -> int:
+    computer.write(dest, 1 if computer.program[a] == computer.program[b] else 0)
+    return ptr + 4
+
+
+def _adjust_relative_base(computer: "IntcodeComputer", ptr: int, a: int) -> int:
+    computer.relative_base += computer.program[a]
+    return ptr + 2
+
+
+def _halt(computer: "IntcodeComputer", ptr: int) -> None:
+    computer.halted = True
+    computer.ptr = ptr
+    return None
+
+
+def _paged(handler: Callable[..., Optional[int]], computer: "IntcodeComputer", ptr: int,
+           *addrs: int) -> Optional[int]:
+    # static addresses past the part of memory that can be indexed directly
+    return computer.run_paged(handler, ptr, addrs)
+
+
+def paged(instruction: Instruction) -> bool:
+    """Whether the instruction has static addresses that can't be indexed directly."""
+    handler = instruction.handler
+    return isinstance(handler, partial) and handler.func is _paged
+
+
+# opcode -> (handler, number of parameters)
+DISPATCH_TABLE: Dict[int, Tuple[Callable[..., Optional[int]], int]] = {
+    1: (_add, 3),
+    2: (_multiply, 3),
+    3: (_input, 1),
+    4: (_output, 1),
+    5: (_jump_if_true, 2),
+    6: (_jump_if_false, 2),
+    7: (_less_than, 3),
+    8: (_equals, 3),
+    9: (_adjust_relative_base, 1),
+    99: (_halt, 0),
+}
+
+
+def decode(memory: Memory, ptr: int) -> Instruction:
+    # the code itself can be anywhere, so it's read through the memory unless it's in the list
+    words = memory.words if 0 <= ptr and ptr + 3 < len(memory.words) else memory
+    opcode, *param_modes = parse_instruction(words[ptr])
+    if opcode not in DISPATCH_TABLE:
+        raise ValueError(f"Bad instruction {words[ptr]} at address {ptr}.")
+    handler, num_params = DISPATCH_TABLE[opcode]
+    modes = tuple(param_modes[:num_params])
+    operands = []
+    indexable = True
+    for arg_num, param_mode in enumerate(modes, 1):
+        if param_mode == 0:
+            # position mode: "if the param is 50, its value is the value stored at address 50"
+            operands.append(words[ptr+arg_num])
+        elif param_mode == 1:
+            # immediate mode: "if the parameter is 50, its value is simply 50"
+            operands.append(ptr + arg_num)
+        elif param_mode == 2:
+            # relative mode: "given a relative base of 50, a relative mode parameter of -7
+            #                 refers to memory address 50 + -7 = 43."
+            operands.append(words[ptr+arg_num])
+        else:
+            raise ValueError(f"Bad parameter mode in {words[ptr]} at address {ptr}.")
+        if param_mode != 2:
+            indexable = memory.reserve(operands[-1]) and indexable
+    if not indexable:
+        handler = partial(_paged, handler)
+    return Instruction(opcode, handler, modes, tuple(operands), 2 in modes, num_params + 1)
+
+
+### Tests ###
+
+assert parse_instruction(1002) == [2, 0, 1, 0]
+assert parse_instruction(3) == [3, 0, 0, 0]
+assert parse_instruction(1101) == [1, 1, 1, 0]
@@ -0,0 +1,97 @@
+"""
+Loading Intcode programs, parsing each input file's text only once.
+
+The parsed program is cached as a binary file named after a hash of the text, in the same int64
+plus escape table format as checkpoints. Later loads of the same text map the cache file instead
+of splitting and converting the text again. An edited input file hashes differently, so it's
+parsed afresh.
+"""
+from typing import List, Optional
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from intcode.checkpoint import pack_escapes, pack_int64s, unpack_escapes, unpack_int64s, \
+    write_atomically
+
+MAGIC = b"ICPG"
+VERSION = 1
+# magic, version, number of words, number of escaped values, padded to 32 bytes
+HEADER = struct.Struct("<4sHxxQQ8x")
+
+# Set INTCODE_CACHE_DIR to keep the cache somewhere else.
+CACHE_DIR = os.environ.get("INTCODE_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        ".intcode-cache"))
+
+
+def parse_program(text: str) -> List[int]:
+    return [int(num) for num in text.strip().split(",")]
+
+
+def _read_cached(path: str) -> Optional[List[int]]:
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                memoryview(mapped) as view:
+            magic, version, num_words, num_escapes = HEADER.unpack_from(view)
+            if magic != MAGIC or version != VERSION:
+                return None
+            program = unpack_int64s(view, HEADER.size, num_words)
+            for idx, value in unpack_escapes(view, HEADER.size + 8 * num_words, num_escapes):
+                program[idx] = value
+            return program
+    except (OSError, ValueError, struct.error):
+        # missing, empty or truncated
+        return None
+
+
+def load_program(path: str, cache_dir: Optional[str] = None) -> List[int]:
+    """The program in the text file at `path`, from the cache if we've parsed that text before."""
+    cache_dir = cache_dir or CACHE_DIR
+    with open(path, "rb") as f:
+        text = f.read()
+    cache_path = os.path.join(cache_dir, hashlib.blake2b(text, digest_size=16).hexdigest() + ".bin")
+    program = _read_cached(cache_path)
+    if program is not None:
+        return program
+
+    program = parse_program(text.decode())
+    escapes = []
+    words = pack_int64s(program, 0, escapes)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomically(cache_path, [HEADER.pack(MAGIC, VERSION, len(program), len(escapes)),
+                                      words, pack_escapes(escapes)])
+    except OSError:
+        # a cache we can't write to just means parsing every time
+        pass
+    return program
+
+
+### Tests ###
+
+with tempfile.TemporaryDirectory() as loader_dir:
+    program_path = os.path.join(loader_dir, "input.txt")
+    loader_cache = os.path.join(loader_dir, "cache")
+    with open(program_path, "w") as f:
+        f.write("104,1125899906842624,104,-1,104,%d,99\n" % 2 ** 80)
+    expected = [104, 1125899906842624, 104, -1, 104, 2 ** 80, 99]
+    assert load_program(program_path, loader_cache) == expected
+    assert len(os.listdir(loader_cache)) == 1
+    # the second load comes from the cache
+    assert _read_cached(os.path.join(loader_cache, os.listdir(loader_cache)[0])) == expected
+    assert load_program(program_path, loader_cache) == expected
+    # changing the file gets a new cache entry
+    with open(program_path, "w") as f:
+        f.write("1,0,0,0,99")
+    assert load_program(program_path, loader_cache) == [1, 0, 0, 0, 99]
+    assert len(os.listdir(loader_cache)) == 2
+    # a truncated cache file is parsed again, whether it's cut at a word boundary or not
+    cache_path = os.path.join(loader_cache, os.listdir(loader_cache)[0])
+    with open(cache_path, "rb") as f:
+        cached_bytes = f.read()
+    for cut in [len(cached_bytes) - 8, len(cached_bytes) - 3]:
+        with open(cache_path, "wb") as f:
+            f.write(cached_bytes[:cut])
+        assert _read_cached(cache_path) is None
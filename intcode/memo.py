@@ -0,0 +1,169 @@
+"""
+Memoized Intcode runs. A program run with the same inputs always gives the same outputs, so we
+keep them: in memory for the most recently used runs, and optionally on disk so they're still
+there next time.
+"""
+from typing import Iterable, List, Optional
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from intcode.checkpoint import pack_escapes, pack_int64s, unpack_escapes, unpack_int64s, \
+    write_atomically
+from intcode.computer import run_intcode
+from intcode.loader import CACHE_DIR
+
+MAGIC = b"ICMO"
+VERSION = 1
+# Part of every run's key, so bump it when a change to the computer could change what programs
+# output: runs cached before then are never read back.
+ENGINE_VERSION = 1
+# magic, version, number of outputs, number of escaped values, padded to 32 bytes
+HEADER = struct.Struct("<4sHxxQQ8x")
+
+# where the puzzle solutions keep their runs, next to the parsed programs
+RUN_CACHE_DIR = os.path.join(CACHE_DIR, "runs")
+
+
+def run_key(program: List[int], inputs: List[int]) -> str:
+    """A hash of the program and its inputs, and the versions of the computer and file format."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(struct.pack("<HH", ENGINE_VERSION, VERSION))
+    for values in (program, inputs):
+        escapes = []
+        words = pack_int64s(values, 0, escapes)
+        digest.update(struct.pack("<QQ", len(values), len(escapes)))
+        digest.update(words)
+        digest.update(pack_escapes(escapes))
+    return digest.hexdigest()
+
+
+class MemoizedRunner:
+    """
+    Runs programs like `run_intcode`, but returns the outputs from last time when a program is run
+    with the same inputs again.
+
+    Up to `max_entries` runs are kept in memory, dropping the least recently used. With a
+    `cache_dir`, runs are saved there too, and the least recently used files are deleted once the
+    directory goes over `max_disk_bytes`.
+    """
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 64 * 2 ** 20, backend: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.backend = backend
+        self._cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def run(self, program: List[int], inputs: Iterable[int] = ()) -> List[int]:
+        inputs = list(inputs)
+        key = run_key(program, inputs)
+        outputs = self._cache.get(key)
+        if outputs is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return list(outputs)
+        outputs = self._read(key)
+        if outputs is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            outputs = list(run_intcode(program, inputs, self.backend))
+            self._write(key, outputs)
+        self._cache[key] = outputs
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return list(outputs)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".bin")
+
+    def _read(self, key: str) -> Optional[List[int]]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view:
+                magic, version, num_outputs, num_escapes = HEADER.unpack_from(view)
+                if magic != MAGIC or version != VERSION:
+                    return None
+                outputs = unpack_int64s(view, HEADER.size, num_outputs)
+                for idx, value in unpack_escapes(view, HEADER.size + 8 * num_outputs,
+                                                 num_escapes):
+                    outputs[idx] = value
+            # mark it as recently used, for eviction
+            os.utime(path)
+            return outputs
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _write(self, key: str, outputs: List[int]) -> None:
+        if self.cache_dir is None:
+            return
+        escapes = []
+        words = pack_int64s(outputs, 0, escapes)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_atomically(self._path(key), [HEADER.pack(MAGIC, VERSION, len(outputs),
+                                                           len(escapes)),
+                                               words, pack_escapes(escapes)])
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = [entry for entry in os.scandir(self.cache_dir)
+                   if entry.is_file() and entry.name.endswith(".bin")]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_disk_bytes:
+                break
+            total -= entry.stat().st_size
+            os.unlink(entry.path)
+
+
+### Tests ###
+
+# outputs whatever it's given, doubled, until it's given 0
+doubler = [3,15, 1006,15,14, 1002,15,2,16, 4,16, 1105,1,0, 99, 0,0]
+runner = MemoizedRunner(max_entries=2)
+assert runner.run(doubler, [1, 2, 0]) == [2, 4]
+assert runner.run(doubler, [1, 2, 0]) == [2, 4]
+assert (runner.hits, runner.misses) == (1, 1)
+runner.run(doubler, [3, 0])
+runner.run(doubler, [2 ** 70, 0])
+# the first run was the least recently used, so it's been dropped
+assert runner.run(doubler, [1, 2, 0]) == [2, 4] and runner.misses == 4
+# runs from an older computer have different keys
+old_key = run_key(doubler, [1, 2, 0])
+ENGINE_VERSION += 1
+assert run_key(doubler, [1, 2, 0]) != old_key
+ENGINE_VERSION -= 1
+
+with tempfile.TemporaryDirectory() as memo_dir:
+    runner = MemoizedRunner(cache_dir=memo_dir, max_disk_bytes=2 * (HEADER.size + 8))
+    assert runner.run(doubler, [2 ** 70, 0]) == [2 ** 71]
+    # a new runner (or a new process) finds it on disk, big int and all
+    runner = MemoizedRunner(cache_dir=memo_dir, max_disk_bytes=2 * (HEADER.size + 8))
+    assert runner.run(doubler, [2 ** 70, 0]) == [2 ** 71] and runner.disk_hits == 1
+    runner.run(doubler, [3, 0])
+    runner.run(doubler, [4, 0])
+    # the big int's file was the oldest, so it's gone to keep under the size limit
+    assert len(os.listdir(memo_dir)) == 2
+    # a truncated file is a miss, and the run is done again
+    truncated_path = os.path.join(memo_dir, os.listdir(memo_dir)[0])
+    with open(truncated_path, "rb") as f:
+        truncated_bytes = f.read()
+    with open(truncated_path, "wb") as f:
+        f.write(truncated_bytes[:-3])
+    runner = MemoizedRunner(cache_dir=memo_dir)
+    runner.run(doubler, [3, 0])
+    runner.run(doubler, [4, 0])
+    assert runner.disk_hits == 1 and runner.misses == 1
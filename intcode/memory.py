@@ -0,0 +1,123 @@
+from typing import DefaultDict, Dict, List, Union
+from collections import defaultdict
+
+Program = Union[List[int], DefaultDict[int, int]]
+
+
+def _negative_address(addr: int) -> ValueError:
+    return ValueError(f"Negative address {addr}.")
+
+
+class DictMemory:
+    """
+    Memory as a dict from positions to values. Any address can be used without setting it up first,
+    and unset addresses read as 0.
+    """
+    def __init__(self, program: List[int]):
+        self.words: DefaultDict[int, int] = defaultdict(int, enumerate(program))
+
+    def reserve(self, addr: int) -> bool:
+        """Whether `addr` can be used in `words` directly: always, unless it's negative."""
+        if addr < 0:
+            raise _negative_address(addr)
+        return True
+
+    def copy(self) -> "DictMemory":
+        memory = DictMemory([])
+        memory.words = self.words.copy()
+        return memory
+
+    def __getitem__(self, addr: int) -> int:
+        return self.words[addr]
+
+    def __setitem__(self, addr: int, value: int) -> None:
+        self.words[addr] = value
+
+
+class FlatMemory:
+    """
+    Memory as a flat list holding the program image, grown with zero-filled pages whenever an
+    address past the end is reserved. `words` stays the same list object as it grows, so the
+    computer can index it directly.
+
+    The list only grows up to `FLAT_LIMIT`. Addresses from there on are kept in a sparse table of
+    pages, which are only made when something is written to them; they can't be indexed directly,
+    so `reserve` returns False for them. Reads of addresses that were never written return 0,
+    without using any memory.
+
+    (We use a list rather than an `array`, since values can be arbitrarily large ints.)
+    """
+    PAGE_SIZE = 1024
+    FLAT_LIMIT = 2 ** 20
+
+    def __init__(self, program: List[int]):
+        self.words: List[int] = list(program)
+        # page number -> page, for addresses past the end of `words` and FLAT_LIMIT
+        self.pages: Dict[int, List[int]] = {}
+
+    def reserve(self, addr: int) -> bool:
+        """Grow `words` to cover `addr` if we can, returning whether it's there to be indexed."""
+        if addr >= len(self.words):
+            if addr >= self.FLAT_LIMIT:
+                return False
+            num_pages = (addr - len(self.words)) // self.PAGE_SIZE + 1
+            # stopping at the limit, so the list never grows over addresses kept in pages
+            new_length = min(len(self.words) + num_pages * self.PAGE_SIZE, self.FLAT_LIMIT)
+            self.words.extend([0] * (new_length - len(self.words)))
+        elif addr < 0:
+            raise _negative_address(addr)
+        return True
+
+    def copy(self) -> "FlatMemory":
+        memory = FlatMemory(self.words)
+        memory.pages = {number: list(page) for number, page in self.pages.items()}
+        return memory
+
+    def __getitem__(self, addr: int) -> int:
+        if 0 <= addr < len(self.words):
+            return self.words[addr]
+        if addr < 0:
+            raise _negative_address(addr)
+        page = self.pages.get(addr // self.PAGE_SIZE)
+        return 0 if page is None else page[addr % self.PAGE_SIZE]
+
+    def __setitem__(self, addr: int, value: int) -> None:
+        if self.reserve(addr):
+            self.words[addr] = value
+            return
+        page = self.pages.get(addr // self.PAGE_SIZE)
+        if page is None:
+            page = self.pages[addr // self.PAGE_SIZE] = [0] * self.PAGE_SIZE
+        page[addr % self.PAGE_SIZE] = value
+
+
+Memory = Union[DictMemory, FlatMemory]
+
+
+class EveryAddress:
+    """Write barrier for memory shared with a snapshot: every write has to copy the memory first."""
+    def __contains__(self, addr: int) -> bool:
+        return True
+
+
+EVERY_ADDRESS = EveryAddress()
+
+
+### Tests ###
+
+flat_memory = FlatMemory([1, 2, 3])
+assert flat_memory.reserve(10) and len(flat_memory.words) == 3 + FlatMemory.PAGE_SIZE
+# reading far past the end doesn't make a page, writing does
+assert not flat_memory.reserve(10 ** 10) and flat_memory[10 ** 10] == 0 and not flat_memory.pages
+flat_memory[10 ** 10] = 5
+assert flat_memory[10 ** 10] == 5 and len(flat_memory.pages) == 1
+assert len(flat_memory.words) == 3 + FlatMemory.PAGE_SIZE
+copied = flat_memory.copy()
+copied[10 ** 10] = 6
+assert flat_memory[10 ** 10] == 5 and copied[10 ** 10] == 6
+for memory_type in [FlatMemory, DictMemory]:
+    try:
+        memory_type([]).reserve(-1)
+        assert False, "negative addresses should be an error"
+    except ValueError:
+        pass
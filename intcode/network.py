@@ -0,0 +1,110 @@
+from typing import Dict, Hashable, Iterable, List
+import asyncio
+from intcode.computer import IntcodeComputer
+
+
+class IntcodeNetwork:
+    """
+    Intcode computers wired together, in any topology: each computer's outputs are sent to the
+    inputs of every computer it's connected to.
+
+    Each computer runs as an asyncio task that sleeps while it's waiting for input, and is woken
+    when another computer sends it something, so blocked computers cost nothing. The network
+    stops once every computer has halted, or is waiting for input that nobody is going to send.
+    """
+    def __init__(self):
+        self.computers: Dict[Hashable, IntcodeComputer] = {}
+        self.links: Dict[Hashable, List[Hashable]] = {}
+        self.last_outputs: Dict[Hashable, int] = {}
+        self._inboxes: Dict[Hashable, asyncio.Queue] = {}
+
+    def add(self, name: Hashable, computer: IntcodeComputer, inputs: Iterable[int] = ()) -> None:
+        self.computers[name] = computer
+        self.links[name] = []
+        computer.feed(inputs)
+        computer.set_outputs(lambda value: self._send_from(name, value))
+
+    def connect(self, src: Hashable, dest: Hashable) -> None:
+        self.links[src].append(dest)
+
+    def send(self, name: Hashable, value: int) -> None:
+        """Give a computer an input from outside the network."""
+        self.computers[name].feed((value,))
+
+    def _send_from(self, name: Hashable, value: int) -> None:
+        self.last_outputs[name] = value
+        for dest in self.links[name]:
+            if dest in self._running:
+                self._inboxes[dest].put_nowait(value)
+                self._undelivered += 1
+
+    async def run(self) -> None:
+        self._inboxes = {name: asyncio.Queue() for name in self.computers}
+        self._running = set(self.computers)
+        self._waiting = 0
+        self._undelivered = 0
+        self._stalled = asyncio.Event()
+        tasks = [asyncio.create_task(self._drive(name)) for name in self.computers]
+        await self._stalled.wait()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _check_stalled(self) -> None:
+        if self._waiting == len(self._running) and self._undelivered == 0:
+            self._stalled.set()
+
+    async def _drive(self, name: Hashable) -> None:
+        computer = self.computers[name]
+        inbox = self._inboxes[name]
+        try:
+            while not computer.run():
+                self._waiting += 1
+                self._check_stalled()
+                values = [await inbox.get()]
+                self._waiting -= 1
+                while not inbox.empty():
+                    values.append(inbox.get_nowait())
+                self._undelivered -= len(values)
+                computer.feed(values)
+        finally:
+            self._running.discard(name)
+            self._undelivered -= inbox.qsize()
+            self._check_stalled()
+
+
+### Tests ###
+
+# a chain of computers that each add one to what they're sent
+add_one = [3,9, 1001,9,1,9, 4,9, 99, 0]
+chain = IntcodeNetwork()
+for idx in range(100):
+    chain.add(idx, IntcodeComputer(add_one))
+    if idx:
+        chain.connect(idx - 1, idx)
+chain.send(0, 0)
+asyncio.run(chain.run())
+assert chain.last_outputs[99] == 100
+
+# a ring passing a counter round until one of them outputs 10 and halts, leaving the rest waiting
+echo = [3,100, 1001,100,1,100, 4,100, 1008,100,10,101, 1006,101,0, 99]
+ring = IntcodeNetwork()
+for idx in range(3):
+    ring.add(idx, IntcodeComputer(echo))
+    ring.connect(idx, (idx + 1) % 3)
+ring.send(0, 0)
+asyncio.run(ring.run())
+assert ring.last_outputs == {0: 10, 1: 11, 2: 12}
+assert [computer.halted for computer in ring.computers.values()] == [True, False, False]
+
+# two computers waiting for each other: the network stops rather than waiting forever
+deadlock = IntcodeNetwork()
+for idx in range(2):
+    deadlock.add(idx, IntcodeComputer(add_one))
+    deadlock.connect(idx, 1 - idx)
+asyncio.run(deadlock.run())
+assert deadlock.last_outputs == {}
@@ -0,0 +1,374 @@
+"""
+Static analysis of Intcode programs: disassembly, a control-flow graph, and a side table of
+rewritten instructions for `IntcodeComputer(optimize=True)`.
+
+The rewrites never change memory. They only replace entries in the computer's decode cache, which
+is guarded by its write barrier, so if the program does write over a rewritten instruction at run
+time the rewrite is dropped and the original is decoded again.
+"""
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
+from functools import partial
+import sys
+from intcode.compiler import JUMP_OPCODES
+from intcode.instructions import Instruction, decode, paged
+from intcode.memory import FlatMemory
+
+if TYPE_CHECKING:
+    from intcode.computer import IntcodeComputer
+
+MNEMONICS = {1: "add", 2: "mul", 3: "in", 4: "out", 5: "jnz", 6: "jz", 7: "lt", 8: "eq",
+             9: "arb", 99: "halt"}
+WRITE_OPCODES = {1, 2, 3, 7, 8}
+
+
+class BasicBlock(NamedTuple):
+    start: int
+    # the address just after its last instruction
+    end: int
+    successors: Tuple[int, ...]
+    # whether it can also jump somewhere we can't work out statically
+    indirect: bool
+
+
+class Analysis(NamedTuple):
+    # every instruction reachable from address 0, by address
+    instructions: Dict[int, Instruction]
+    blocks: Dict[int, BasicBlock]
+    # addresses written by position mode operands. Relative mode writes can go anywhere.
+    static_writes: Set[int]
+    # [start, end) ranges of the program that are never reached: dead code, or data
+    unreached: List[Tuple[int, int]]
+
+
+def _successors(program: List[int], ptr: int,
+                instruction: Instruction) -> Tuple[List[int], Optional[int]]:
+    """
+    Where execution can go after an instruction: (the addresses we know of, the address holding
+    the jump target if that depends on memory).
+    """
+    opcode = instruction.opcode
+    next_ptr = ptr + instruction.length
+    if opcode == 99:
+        return [], None
+    if opcode not in JUMP_OPCODES:
+        return [next_ptr], None
+
+    cond_mode, target_mode = instruction.modes
+    cond_addr, target_addr = instruction.operands
+    if target_mode == 1:
+        targets, target_word = [program[target_addr]], None
+    elif target_mode == 0 and 0 <= target_addr < len(program):
+        # the target's wherever this word says, which is only known if nothing writes to it
+        targets, target_word = [program[target_addr]], target_addr
+    else:
+        targets, target_word = [], -1
+    if cond_mode == 1:
+        # a constant condition always or never jumps, e.g. `1105,1,X`
+        if bool(program[cond_addr]) == (opcode == 5):
+            return targets, target_word
+        return [next_ptr], None
+    return targets + [next_ptr], target_word
+
+
+def analyze(program: List[int]) -> Analysis:
+    """
+    Disassemble everything reachable from address 0, and build the control-flow graph.
+
+    Jumps to a target read from memory are followed to wherever the memory says when the program
+    starts, unless something writes there. Jumps we can't follow (e.g. returns, which read their
+    target off the stack in relative mode) are taken to land on any address that appears as an
+    immediate operand, since that's how return addresses get pushed.
+    """
+    memory = FlatMemory(program)
+    instructions: Dict[int, Instruction] = {}
+    successors: Dict[int, List[int]] = {}
+    # instruction -> the address its jump target is read from, or -1 if it's relative
+    target_words: Dict[int, int] = {}
+    # where indirect jumps might land
+    indirect_targets: Set[int] = set()
+    visited: Set[int] = set()
+    to_visit = [0]
+    while True:
+        while to_visit:
+            ptr = to_visit.pop()
+            if ptr in visited or not 0 <= ptr < len(program):
+                continue
+            visited.add(ptr)
+            try:
+                instruction = decode(memory, ptr)
+            except ValueError:
+                continue
+            instructions[ptr] = instruction
+            successors[ptr], target_word = _successors(program, ptr, instruction)
+            if target_word is not None:
+                target_words[ptr] = target_word
+            to_visit.extend(successors[ptr])
+
+        static_writes = {instruction.operands[-1] for instruction in instructions.values()
+                         if instruction.opcode in WRITE_OPCODES and instruction.modes[-1] == 0}
+        indirect = {ptr for ptr, word in target_words.items()
+                    if word == -1 or word in static_writes}
+        if indirect:
+            to_visit = [program[addr] for instruction in instructions.values()
+                        for mode, addr in zip(instruction.modes, instruction.operands)
+                        if mode == 1 and 0 <= program[addr] < len(program)
+                        and program[addr] not in visited]
+            indirect_targets.update(to_visit)
+        if not to_visit:
+            break
+
+    # blocks start at address 0, at jump targets, and after jumps
+    leaders = {0}
+    for ptr, instruction in instructions.items():
+        if instruction.opcode in JUMP_OPCODES or instruction.opcode == 99:
+            leaders.update(successors[ptr])
+            leaders.add(ptr + instruction.length)
+    leaders.update(indirect_targets)
+    blocks: Dict[int, BasicBlock] = {}
+    for start in sorted(leaders & instructions.keys()):
+        ptr = start
+        while True:
+            next_ptr = ptr + instructions[ptr].length
+            if (next_ptr in leaders or next_ptr not in instructions
+                    or successors[ptr] != [next_ptr]):
+                break
+            ptr = next_ptr
+        blocks[start] = BasicBlock(start, next_ptr, tuple(successors[ptr]), ptr in indirect)
+
+    covered = set()
+    for ptr, instruction in instructions.items():
+        covered.update(range(ptr, ptr + instruction.length))
+    unreached = []
+    for addr in range(len(program)):
+        if addr in covered:
+            continue
+        if unreached and unreached[-1][1] == addr:
+            unreached[-1] = (unreached[-1][0], addr + 1)
+        else:
+            unreached.append((addr, addr + 1))
+    return Analysis(instructions, blocks, static_writes, unreached)
+
+
+### Rewrites ###
+
+# Each compare-and-jump superinstruction runs a 7/8 and the 5/6 straight after it in one dispatch.
+# The compare's result is still written to memory as usual, but it only goes through
+# `computer.write` if it's behind the write barrier: most compares write to a data address, which
+# can be stored straight into memory.
+
+def _less_than_jump_if_true(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int,
+                            cond: int, target: int) -> int:
+    program = computer.program
+    value = 1 if program[a] < program[b] else 0
+    if dest in computer._write_barrier:
+        computer.write(dest, value)
+        if ptr <= dest < ptr + 7:
+            # the compare rewrote the jump, so leave it to be decoded again
+            return ptr + 4
+        program = computer.program
+    else:
+        program[dest] = value
+    return program[target] if program[cond] else ptr + 7
+
+
+def _less_than_jump_if_false(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int,
+                             cond: int, target: int) -> int:
+    program = computer.program
+    value = 1 if program[a] < program[b] else 0
+    if dest in computer._write_barrier:
+        computer.write(dest, value)
+        if ptr <= dest < ptr + 7:
+            return ptr + 4
+        program = computer.program
+    else:
+        program[dest] = value
+    return ptr + 7 if program[cond] else program[target]
+
+
+def _equals_jump_if_true(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int,
+                         cond: int, target: int) -> int:
+    program = computer.program
+    value = 1 if program[a] == program[b] else 0
+    if dest in computer._write_barrier:
+        computer.write(dest, value)
+        if ptr <= dest < ptr + 7:
+            return ptr + 4
+        program = computer.program
+    else:
+        program[dest] = value
+    return program[target] if program[cond] else ptr + 7
+
+
+def _equals_jump_if_false(computer: "IntcodeComputer", ptr: int, a: int, b: int, dest: int,
+                          cond: int, target: int) -> int:
+    program = computer.program
+    value = 1 if program[a] == program[b] else 0
+    if dest in computer._write_barrier:
+        computer.write(dest, value)
+        if ptr <= dest < ptr + 7:
+            return ptr + 4
+        program = computer.program
+    else:
+        program[dest] = value
+    return ptr + 7 if program[cond] else program[target]
+
+
+# (compare opcode, jump opcode) -> superinstruction
+FUSED_HANDLERS = {
+    (7, 5): _less_than_jump_if_true,
+    (7, 6): _less_than_jump_if_false,
+    (8, 5): _equals_jump_if_true,
+    (8, 6): _equals_jump_if_false,
+}
+
+
+def _store_constant(value: int, computer: "IntcodeComputer", ptr: int, dest: int) -> int:
+    if dest in computer._write_barrier:
+        computer.write(dest, value)
+    else:
+        computer.program[dest] = value
+    return ptr + 4
+
+
+def fold_constant(program: List[int], ptr: int, instruction: Instruction) -> Optional[Instruction]:
+    """An add, multiply or compare of two immediates becomes a store of the result."""
+    if instruction.opcode not in (1, 2, 7, 8) or instruction.modes[:2] != (1, 1) or \
+            paged(instruction):
+        return None
+    a, b = program[ptr + 1], program[ptr + 2]
+    value = {1: a + b, 2: a * b, 7: int(a < b), 8: int(a == b)}[instruction.opcode]
+    dest_mode = instruction.modes[2]
+    return Instruction(instruction.opcode, partial(_store_constant, value), (dest_mode,),
+                       (instruction.operands[2],), dest_mode == 2, instruction.length)
+
+
+def fuse(ptr: int, compare: Instruction, jump: Instruction) -> Optional[Instruction]:
+    """A compare followed by a conditional jump becomes one superinstruction."""
+    handler = FUSED_HANDLERS.get((compare.opcode, jump.opcode))
+    if handler is None or paged(compare) or paged(jump):
+        return None
+    # a compare that writes over itself or the jump can't be fused. Relative mode destinations
+    # are only known at run time, so the superinstruction checks those itself.
+    if compare.modes[2] == 0 and ptr <= compare.operands[2] < ptr + 7:
+        return None
+    return Instruction(compare.opcode, handler, compare.modes + jump.modes,
+                       compare.operands + jump.operands, compare.relative or jump.relative,
+                       compare.length + jump.length)
+
+
+def optimize(program: List[int], analysis: Optional[Analysis] = None) -> Dict[int, Instruction]:
+    """
+    The side table of rewritten instructions for a program, by address. Instructions the program
+    writes to with position mode are left alone; relative mode writes are caught by the computer's
+    write barrier at run time.
+    """
+    analysis = analysis or analyze(program)
+    instructions = analysis.instructions
+
+    def untouched(ptr: int, length: int) -> bool:
+        return not any(addr in analysis.static_writes for addr in range(ptr, ptr + length))
+
+    table: Dict[int, Instruction] = {}
+    for ptr, instruction in sorted(instructions.items()):
+        next_instruction = instructions.get(ptr + instruction.length)
+        fused = fold_constant(program, ptr, instruction)
+        if fused is None and next_instruction is not None:
+            fused = fuse(ptr, instruction, next_instruction)
+        if fused is not None and untouched(ptr, fused.length):
+            table[ptr] = fused
+    return table
+
+
+# A rewrite, with the words it replaces: it only stands in for them while memory still holds them
+Rewrite = Tuple[Tuple[int, ...], Instruction]
+
+# program -> its side table, so running the same program again doesn't repeat the analysis
+TABLE_CACHE: Dict[Tuple[int, ...], Dict[int, Rewrite]] = {}
+
+
+def cached_optimize(program: List[int]) -> Dict[int, Rewrite]:
+    key = tuple(program)
+    table = TABLE_CACHE.get(key)
+    if table is None:
+        table = TABLE_CACHE[key] = {
+            ptr: (key[ptr:ptr + instruction.length], instruction)
+            for ptr, instruction in optimize(program).items()}
+    return table
+
+
+def disassemble(program: List[int], analysis: Optional[Analysis] = None) -> str:
+    """A listing of the program, with its basic blocks and the ranges that are never reached."""
+    analysis = analysis or analyze(program)
+    table = optimize(program, analysis)
+    unreached = {start: end for start, end in analysis.unreached}
+    lines = []
+    addr = 0
+    while addr < len(program):
+        if addr in unreached:
+            end = unreached[addr]
+            lines.append(f"{addr:5}  ; {end - addr} words never reached: {program[addr:end][:8]}"
+                         f"{'...' if end - addr > 8 else ''}")
+            addr = end
+            continue
+        block = analysis.blocks.get(addr)
+        if block is not None:
+            successors = ", ".join(map(str, block.successors))
+            lines.append(f"{'':5}  ; block {block.start}-{block.end - 1} -> {successors}"
+                         f"{' (indirect)' if block.indirect else ''}")
+        instruction = analysis.instructions[addr]
+        operands = []
+        for mode, operand in zip(instruction.modes, instruction.operands):
+            if mode == 0:
+                operands.append(f"[{operand}]")
+            elif mode == 1:
+                operands.append(str(program[operand]))
+            else:
+                operands.append(f"[rb{operand:+}]")
+        note = ""
+        if addr in table:
+            note = "  ; fused" if table[addr].length > instruction.length else "  ; folded"
+        lines.append(f"{addr:5}  {MNEMONICS[instruction.opcode]:<4} {', '.join(operands)}{note}")
+        addr += instruction.length
+    return "\n".join(lines)
+
+
+### Tests ###
+
+# count down from 5, outputting each number: the first add is folded, and the compare and jump
+# at the end of the loop are fused
+countdown = [1101,0,5,20, 4,20, 1001,20,-1,20, 1008,20,0,21, 1006,21,4, 99, 0,0,0,0]
+countdown_analysis = analyze(countdown)
+assert countdown_analysis.unreached == [(18, 22)]
+assert countdown_analysis.static_writes == {20, 21}
+assert {block.start: block.successors for block in countdown_analysis.blocks.values()} == \
+    {0: (4,), 4: (4, 17), 17: ()}
+countdown_table = optimize(countdown)
+assert sorted(countdown_table) == [0, 10]
+assert countdown_table[10].length == 7
+
+# code jumped over is never reached, and a constant condition that's never true doesn't jump
+assert analyze([1105,1,7, 104,1,99,0, 1106,1,3, 99]).unreached == [(3, 7)]
+
+# the stack-based call/return from day 9 style programs: the return address is pushed as an
+# immediate, and the return reads it back in relative mode
+call_return = [109,20, 21101,9,0,0, 1105,1,11, 99, 0, 104,42, 2106,0,0]
+call_analysis = analyze(call_return)
+assert call_analysis.blocks[11].indirect
+assert 9 in call_analysis.instructions and call_analysis.unreached == [(10, 11)]
+
+# a relative mode compare that rewrites the condition of the jump after it still gets fused,
+# since where it writes is only known at run time
+rewrite_jump = [109,11, 21007,15,1,-4, 1105,0,12, 104,7,99, 104,8,99, 0]
+assert optimize(rewrite_jump)[2].length == 7
+
+
+if __name__ == "__main__":
+    # python -m intcode.optimizer path/to/input.txt
+    with open(sys.argv[1]) as f:
+        program = [int(num) for num in f.read().strip().split(",")]
+    analysis = analyze(program)
+    print(disassemble(program, analysis))
+    table = optimize(program, analysis)
+    print(f"; {len(analysis.instructions)} instructions in {len(analysis.blocks)} blocks, "
+          f"{sum(end - start for start, end in analysis.unreached)} words never reached, "
+          f"{len(table)} rewritten")
@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+from collections import Counter
+import json
+
+
+class Profile:
+    """What a computer got up to while it was being profiled."""
+    def __init__(self):
+        self.opcode_counts: Counter = Counter()
+        self.address_counts: Counter = Counter()
+        self.run_seconds: List[float] = []
+        # highest address reached with relative mode, i.e. how far up the stack/heap went
+        self.max_relative_address: Optional[int] = None
+        self.input_waits = 0
+
+    def report(self, num_hot_addresses: int = 20) -> Dict[str, object]:
+        return {
+            "instructions": sum(self.opcode_counts.values()),
+            "opcode_counts": {str(opcode): count
+                              for opcode, count in sorted(self.opcode_counts.items())},
+            "hot_addresses": [{"address": addr, "count": count}
+                              for addr, count in self.address_counts.most_common(num_hot_addresses)],
+            "run_seconds": self.run_seconds,
+            "total_run_seconds": sum(self.run_seconds),
+            "max_relative_address": self.max_relative_address,
+            "input_waits": self.input_waits,
+        }
+
+    def to_json(self, num_hot_addresses: int = 20) -> str:
+        return json.dumps(self.report(num_hot_addresses), indent=2)
+
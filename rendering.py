@@ -0,0 +1,113 @@
+"""
+Showing the puzzles' small black and white images without a plotting library.
+
+An image is rows of pixels, where any non-zero pixel is drawn (e.g. a list of lists, or a 2D NumPy
+array). It can be printed as block characters, or written as a PBM or PNG file using only the
+standard library. matplotlib is only imported if the image is actually shown in a window.
+
+From a day's script, `output_image(image)` prints the image and then looks at the command line:
+`--show` opens it in a window, and `--save PATH` writes it to PATH (.png, .pbm or .txt).
+"""
+from typing import List, Optional, Sequence
+import contextlib
+import io
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+Image = Sequence[Sequence[int]]
+
+
+def _rows(image: Image) -> List[List[bool]]:
+    return [[bool(pixel) for pixel in row] for row in image]
+
+
+def to_ascii(image: Image, on: str = "█", off: str = " ") -> str:
+    return "\n".join("".join(on if pixel else off for pixel in row) for row in _rows(image))
+
+
+def to_pbm(image: Image) -> bytes:
+    """A binary (P4) PBM, where drawn pixels are black."""
+    rows = _rows(image)
+    width = len(rows[0]) if rows else 0
+    data = [f"P4\n{width} {len(rows)}\n".encode()]
+    row_bytes = (width + 7) // 8
+    for row in rows:
+        bits = "".join("1" if pixel else "0" for pixel in row).ljust(8 * row_bytes, "0")
+        data.append(int(bits or "0", 2).to_bytes(row_bytes, "big"))
+    return b"".join(data)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def to_png(image: Image, scale: int = 1) -> bytes:
+    """An 8-bit greyscale PNG with drawn pixels black, each `scale` by `scale` pixels."""
+    rows = _rows(image)
+    width = len(rows[0]) * scale if rows else 0
+    scanlines = []
+    for row in rows:
+        # each scanline starts with its filter type, 0 for none
+        line = b"\x00" + b"".join((b"\x00" if pixel else b"\xff") * scale for pixel in row)
+        scanlines.extend([line] * scale)
+    header = struct.pack(">IIBBBBB", width, len(rows) * scale, 8, 0, 0, 0, 0)
+    return b"".join([b"\x89PNG\r\n\x1a\n",
+                     _png_chunk(b"IHDR", header),
+                     _png_chunk(b"IDAT", zlib.compress(b"".join(scanlines))),
+                     _png_chunk(b"IEND", b"")])
+
+
+def save_image(image: Image, path: str, scale: int = 8) -> None:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png":
+        data = to_png(image, scale)
+    elif extension == ".pbm":
+        data = to_pbm(image)
+    elif extension == ".txt":
+        data = (to_ascii(image) + "\n").encode()
+    else:
+        raise ValueError(f"Can't save an image as {extension or 'a file with no extension'}.")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def show_image(image: Image) -> None:
+    from matplotlib import pyplot as plt
+    plt.imshow([[1 if pixel else 0 for pixel in row] for row in _rows(image)], cmap="Greys")
+    plt.show()
+
+
+def output_image(image: Image, argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv if argv is None else argv
+    print(to_ascii(image))
+    if "--save" in argv:
+        save_image(image, argv[argv.index("--save") + 1])
+    if "--show" in argv:
+        show_image(image)
+
+
+### Tests ###
+
+TEST_IMAGE = [[1, 0, 1, 0, 0, 0, 0, 0, 1],
+              [0, 2, 0, 0, 0, 0, 0, 0, 0]]
+assert to_ascii(TEST_IMAGE, "#", ".") == "#.#.....#\n.#......."
+assert to_pbm(TEST_IMAGE) == b"P4\n9 2\n" + bytes([0b10100000, 0b10000000, 0b01000000, 0])
+
+png = to_png(TEST_IMAGE, scale=2)
+assert png.startswith(b"\x89PNG\r\n\x1a\n")
+assert struct.unpack(">II", png[16:24]) == (18, 4)
+idat_length = struct.unpack(">I", png[33:37])[0]
+pixels = zlib.decompress(png[41:41 + idat_length])
+assert len(pixels) == 4 * (1 + 18)
+assert pixels[:5] == b"\x00\x00\x00\xff\xff" and pixels[19:24] == pixels[:5]
+
+with tempfile.TemporaryDirectory() as image_dir:
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        output_image(TEST_IMAGE, ["--save", os.path.join(image_dir, "image.pbm")])
+    assert printed.getvalue() == to_ascii(TEST_IMAGE) + "\n"
+    with open(os.path.join(image_dir, "image.pbm"), "rb") as f:
+        assert f.read() == to_pbm(TEST_IMAGE)